@@ -1,9 +1,38 @@
-from app.calculator_repl import REPL
+import argparse
+import sys
+from contextlib import redirect_stdout
+from app.calculator import REPL
+from app.batch_mode import run_batch
 
-def start_app():
+def start_app(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app", description="Command-line calculator.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run commands from FILE (default: stdin) without the interactive prompt")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="evaluate batch input in N worker processes (default: CALCULATOR_BATCH_WORKERS or 1)")
+    parser.add_argument("--chunk-size", type=int, metavar="LINES",
+                        help="lines per worker chunk (default: CALCULATOR_BATCH_CHUNK_SIZE or 5000)")
+    args = parser.parse_args(argv)
+    batch = args.batch or (None if sys.stdin.isatty() else "-")
+    if batch is None:
+        REPL().run()
+        return
 
-    repl = REPL()
-    repl.run()
+    with redirect_stdout(sys.stderr):
+        repl = REPL()
+    if not repl.app: sys.exit(1)
+    source = sys.stdin if batch == "-" else open(batch, encoding=repl.app.config.encoding)
+    with source, open(sys.stdout.fileno(), "w", buffering=1 << 16, closefd=False,
+                      encoding=repl.app.config.encoding) as out:
+        config = repl.app.config
+        workers = args.workers or config.batch_workers
+        if workers > 1:
+            from app.parallel import run_parallel_batch
+            stats = run_parallel_batch(repl, source, out, workers, args.chunk_size or config.batch_chunk_size)
+        else:
+            stats = run_batch(repl, source, out)
+    repl.app.close()
+    print(stats, file=sys.stderr)
 
 if __name__ == '__main__':
     start_app()
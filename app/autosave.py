@@ -0,0 +1,70 @@
+import atexit
+import threading
+import time
+
+class AutosaveScheduler:
+    # Coalesces save requests on a background thread. A save runs `debounce` seconds after the latest request,
+    # but never more than `max_delay` seconds after the first request it covers, so a steady stream of
+    # calculations still reaches disk. flush() saves pending state immediately; close() stops the worker and flushes.
+    def __init__(self, save, debounce: float, max_delay: float, logger=None):
+        if debounce <= 0: raise ValueError("Autosave debounce must be positive.")
+        if max_delay < debounce: raise ValueError("Autosave max delay must be at least the debounce interval.")
+        self._save, self.debounce, self.max_delay, self._logger = save, debounce, max_delay, logger
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._deadline = None
+        self._dirty_since = None
+        self._closed = False
+        self.requests = 0
+        self.saves = 0
+        self.failures = 0
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> bool:
+        return self._deadline is not None
+
+    def mark_dirty(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests += 1
+            if self._dirty_since is None: self._dirty_since = now
+            self._deadline = min(now + self.debounce, self._dirty_since + self.max_delay)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._deadline is None or self._deadline > time.monotonic()):
+                    self._cond.wait(None if self._deadline is None else self._deadline - time.monotonic())
+                if self._closed: return
+            self.flush()
+
+    def flush(self) -> bool:
+        # The dirty state is cleared before saving, so requests made during the save schedule another one.
+        with self._save_lock:
+            with self._cond:
+                if self._deadline is None: return False
+                self._deadline = self._dirty_since = None
+            try:
+                self._save()
+            except Exception as e:
+                self.failures += 1
+                if self._logger: self._logger.error(f"Autosave failed: {e}", exc_info=True)
+                return False
+            self.saves += 1
+            return True
+
+    def close(self):
+        with self._cond:
+            if self._closed: return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+        self.flush()
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "saves": self.saves, "failures": self.failures, "pending": self.pending}
@@ -0,0 +1,63 @@
+import time
+import numpy as np
+from app.operations import OperationFactory
+from app.exceptions import ValidationError
+
+class BatchResult:
+    # Column-wise outcome of one execute_batch call; error code k > 0 maps to messages[k - 1].
+    def __init__(self, op_names, operand_a, operand_b, results, codes, messages: list[str]):
+        self.op_names = op_names
+        self.operand_a = operand_a
+        self.operand_b = operand_b
+        self.results = results
+        self.codes = codes
+        self.messages = messages
+        self.timestamp = time.time()
+
+    def __len__(self): return len(self.results)
+
+    @property
+    def errors(self):
+        return self.codes != 0
+
+    @property
+    def error_count(self) -> int:
+        return int(np.count_nonzero(self.codes))
+
+    def error_message(self, index: int):
+        code = self.codes[index]
+        return self.messages[code - 1] if code else None
+
+    def rows(self) -> list[tuple]:
+        ok = ~self.errors
+        return list(zip(self.operand_a[ok].tolist(), self.operand_b[ok].tolist(),
+                        self.op_names[ok].tolist(), self.results[ok].tolist()))
+
+
+def evaluate(op_names, operand_a, operand_b, precision: int) -> BatchResult:
+    a, b = np.asarray(operand_a, dtype=np.float64), np.asarray(operand_b, dtype=np.float64)
+    if a.shape != b.shape: raise ValidationError("Operand arrays must have the same length.")
+    # Aliases are resolved up front so history records the operation name; unknown names fail in create() below.
+    if isinstance(op_names, str):
+        op_names = OperationFactory.resolve(op_names) or op_names
+        names = np.full(a.shape, op_names, dtype=object)
+    else:
+        names = np.asarray(op_names, dtype=object)
+        canonical = {name: OperationFactory.resolve(name) or name for name in dict.fromkeys(names.tolist())}
+        if any(name != op_name for name, op_name in canonical.items()):
+            names = np.asarray([canonical[name] for name in names.tolist()], dtype=object).reshape(names.shape)
+    if names.shape != a.shape: raise ValidationError("Operation names must match the operand arrays.")
+    results = np.full(a.shape, np.nan)
+    codes = np.zeros(a.shape, dtype=np.int16)
+    messages: list[str] = []
+    for op_name in dict.fromkeys(names.tolist()):
+        operation = OperationFactory.create(op_name)
+        index = slice(None) if isinstance(op_names, str) else np.flatnonzero(names == op_name)
+        op_results, op_codes = operation.execute_batch(a[index], b[index])
+        results[index] = op_results
+        codes[index] = np.where(op_codes > 0, op_codes + len(messages), 0)
+        messages.extend(operation.error_messages)
+    # Python's round() is correctly rounded while np.round scales by 10**precision first, so the finished values
+    # are rounded one by one to match execute_calculation exactly.
+    rounded = np.fromiter((round(x, precision) for x in results.tolist()), np.float64, len(results))
+    return BatchResult(names, a, b, rounded, codes, messages)
@@ -0,0 +1,60 @@
+import io
+import time
+from contextlib import redirect_stdout
+from app.operations import OperationFactory
+from app.input_validators import validate_operands
+from app.exceptions import CalculatorError
+
+class BatchStats:
+    def __init__(self):
+        self.lines = 0
+        self.seconds = 0.0
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"Processed {self.lines} lines in {self.seconds:.3f}s ({self.lines_per_sec:,.0f} lines/sec)"
+
+
+def count_lines(lines, stats: BatchStats):
+    for line in lines:
+        stats.lines += 1
+        yield line
+
+def parse_lines(lines):
+    for line in lines:
+        # Only the command word is case-insensitive; arguments such as file names keep their case.
+        parts = line.split()
+        if parts: yield [parts[0].lower(), *parts[1:]]
+
+def execute_commands(repl, commands):
+    # Calculations take a fast path; other commands reuse the REPL and capture what it prints.
+    app, resolve = repl.app, OperationFactory.resolve
+    for cmd_name, *args in commands:
+        op_name = None if cmd_name in repl.commands else resolve(cmd_name)
+        if op_name:
+            try:
+                a, b = validate_operands(args, app.config.max_input)
+                yield f"Result: {app.execute_calculation(op_name, a, b)}\n"
+            except (CalculatorError, IndexError) as e:
+                yield f"Error: {e}\n"
+        elif cmd_name == "exit":
+            return
+        else:
+            yield run_command(repl, cmd_name, args)
+
+def run_command(repl, cmd_name: str, args: list) -> str:
+    captured = io.StringIO()
+    with redirect_stdout(captured):
+        repl.execute_command(cmd_name, args)
+    return captured.getvalue()
+
+def run_batch(repl, lines, out) -> BatchStats:
+    stats, start = BatchStats(), time.perf_counter()
+    with repl.app.deferred_autosave():
+        out.writelines(execute_commands(repl, parse_lines(count_lines(lines, stats))))
+        out.flush()
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,46 @@
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+class ResultCache:
+    # Bounded LRU of computed results; exceptions raised by compute() propagate and are never stored.
+    # With thread_safe the entries are guarded by a lock, but compute() runs outside it.
+    def __init__(self, maxsize: int, thread_safe: bool = False):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock() if thread_safe else nullcontext()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self): return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {"size": len(self), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        with self._lock: self._entries.clear()
@@ -1,12 +1,35 @@
+import time
 from datetime import datetime
+
 class Calculation:
-    def __init__(self, operand_a: float, operand_b: float, operation_name: str, result: float):
+    # The creation time is kept as integer nanoseconds so the ISO string is only built on display/export
+    # and floors to the microsecond exactly like datetime.now(); `created` is that microsecond as epoch seconds.
+    __slots__ = ("operand_a", "operand_b", "operation_name", "result", "_ns", "_iso")
+
+    def __init__(self, operand_a: float, operand_b: float, operation_name: str, result: float, created: float = None):
         self.operand_a = operand_a
         self.operand_b = operand_b
         self.operation_name = operation_name
         self.result = result
-        self.timestamp = datetime.now().isoformat()
-    
+        self._ns = time.time_ns() if created is None else round(created * 1_000_000) * 1000
+        self._iso = None
+
+    @property
+    def created(self) -> float:
+        return (self._ns // 1000) / 1_000_000
+
+    @property
+    def timestamp(self) -> str:
+        if self._iso is None:
+            seconds, ns = divmod(self._ns, 1_000_000_000)
+            self._iso = datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
+        return self._iso
+
+    @timestamp.setter
+    def timestamp(self, value: str):
+        self._ns = round(datetime.fromisoformat(value).timestamp() * 1_000_000) * 1000
+        self._iso = value
+
     def to_dict(self):
         return {
             "operand_a": self.operand_a, "operand_b": self.operand_b,
@@ -16,7 +39,7 @@ class Calculation:
 
     def __repr__(self):
         return f"Calculation({self.operand_a}, {self.operand_b}, '{self.operation_name}', {self.result})"
-    
+
 
     @staticmethod
     def from_dict(data: dict):
@@ -24,5 +47,5 @@ class Calculation:
             float(data['operand_a']), float(data['operand_b']),
             data['operation_name'], float(data['result'])
         )
-        calc.timestamp = data.get('timestamp', datetime.now().isoformat())
-        return calc
\ No newline at end of file
+        if data.get('timestamp'): calc.timestamp = data['timestamp']
+        return calc
@@ -1,12 +1,19 @@
+import json
 import logging
+import threading
+from contextlib import contextmanager, nullcontext
 from app.operations import OperationFactory
 from app.calculation import Calculation
 from app.history import HistoryManager
 from app.calculator_memento import Caretaker
 from app.calculator_config import CalculatorConfig
-from app.input_validators import validate_operands
-from app.exceptions import CalculatorError
-from app.logger import setup_logger
+from app.input_validators import validate_operands, parse_history_query
+from app.exceptions import CalculatorError, ValidationError
+from app.logger import setup_logger, stop_logger
+from app.cache import ResultCache
+from app.dispatch import AsyncDispatcher
+from app.autosave import AutosaveScheduler
+from app.instrumentation import Instrumentation
 
 
 class Observer:
@@ -15,67 +22,265 @@ class Observer:
 class LoggingObserver(Observer):
     def __init__(self, logger: logging.Logger): self.logger = logger
     def update(self, event: str, data: any):
-        if event == "calculation": self.logger.info(f"Calculation: {data.to_dict()}")
+        # Arguments are formatted on the log listener thread, and only for records that survive sampling.
+        if not self.logger.isEnabledFor(logging.INFO): return
+        if event == "calculation":
+            self.logger.info("Calculation: %s %s %s = %s at %s", data.operation_name, data.operand_a, data.operand_b,
+                             data.result, data.timestamp, extra={"sampled": True})
+        elif event == "batch": self.logger.info("Batch: %d rows, %d errors", len(data), data.error_count)
 
 class AutoSaveObserver(Observer):
-    def __init__(self, history: HistoryManager, config: CalculatorConfig):
-        self.history, self.config = history, config
+    # With a scheduler, snapshots are debounced onto its thread; journal appends are always written inline.
+    def __init__(self, history: HistoryManager, config: CalculatorConfig, scheduler: AutosaveScheduler = None):
+        self.history, self.config, self.scheduler = history, config, scheduler
+        self.paused = False
     def update(self, event: str, data: any):
-        if event == "calculation" and self.config.auto_save:
-            self.history.save(self.config.history_filepath, self.config.encoding)
+        if not self.config.auto_save or self.paused: return
+        if event == "resync":
+            self._snapshot()
+        elif self.config.save_mode == "journal":
+            self.history.record(event, self.config.history_filepath, self.config.encoding, data)
+            if self.history.journal_events >= self.config.journal_compact_every: self._snapshot()
+        elif event in ("calculation", "batch"):
+            self._snapshot()
+    def _snapshot(self):
+        if self.scheduler: self.scheduler.mark_dirty()
+        else: self.history.save(self.config.history_filepath, self.config.encoding)
 
 class CalculatorApp:
-    def __init__(self):
-        self.config = CalculatorConfig()
-        self.logger = setup_logger(self.config.log_dir)
-        self.history = HistoryManager(self.config.max_history)
-        self.caretaker = Caretaker(self.history)
+    def __init__(self, parent: "CalculatorApp" = None):
         self.observers: list[Observer] = []
+        self.inline_observers: list[Observer] = []
+        self.scheduler = self.dispatcher = self.instrumentation = None
+        if parent is None: self._init_persistent()
+        else: self._init_session(parent)
+
+    def _init_session(self, parent: "CalculatorApp"):
+        # A session (see app.server) shares the parent's config, logger and cache and keeps its own in-memory
+        # history and undo stack, without persistence, observers or instrumentation.
+        self.config, self.logger, self.cache = parent.config, parent.logger, parent.cache
+        self.lock = nullcontext()
+        self.history = HistoryManager(self.config.max_history)
+        self.caretaker = Caretaker(self.history, self.config.max_undo)
+        self.caretaker.save()
+
+    def _init_persistent(self):
+        self.config = CalculatorConfig()
+        self.logger = setup_logger(self.config.log_dir, max_bytes=self.config.log_max_bytes,
+                                   backup_count=self.config.log_backup_count, rotate_when=self.config.log_rotate_when,
+                                   log_format=self.config.log_format, sample_rate=self.config.log_sample_rate)
+        # A debounced autosave saves from its own thread, and so do snapshot saves delivered by async observers;
+        # either way history always needs its lock.
+        debounced = self.config.auto_save and self.config.autosave_debounce > 0
+        background_saves = debounced or (self.config.auto_save and self.config.observer_mode == "async"
+                                         and self.config.save_mode == "snapshot")
+        self.history = HistoryManager(self.config.max_history, self.config.thread_safe or background_saves,
+                                      self.config.fsync_policy, self.config.fsync_interval, self.config.multi_writer,
+                                      self._open_archive())
+        # In thread-safe mode `lock` serializes every change to history, undo state and observers, so each
+        # command is atomic and autosave sees changes in the order they happened. Operations compute outside it.
+        # In multi-writer mode it also holds the shared file lock and merges other processes' rows on entry.
+        if self.config.multi_writer:
+            self.lock = self.history.shared_lock(self.config.history_filepath, self.config.encoding)
+        else:
+            self.lock = threading.RLock() if self.config.thread_safe else nullcontext()
+        self.scheduler = AutosaveScheduler(
+            lambda: self.history.save(self.config.history_filepath, self.config.encoding),
+            self.config.autosave_debounce, self.config.autosave_max_delay, self.logger) if debounced else None
+        self.caretaker = Caretaker(self.history, self.config.max_undo)
+        self.cache = ResultCache(self.config.cache_size, self.config.thread_safe) if self.config.cache_size > 0 else None
+        self.dispatcher = AsyncDispatcher(self.observers, self.config.observer_queue_size,
+                                          self.config.observer_backpressure, self.logger) \
+            if self.config.observer_mode == "async" else None
         self._register_observers()
+        if self.config.instrumentation:
+            self.instrumentation = Instrumentation()
+            self.instrumentation.install(self)
         self.load_history()
 
+    def _open_archive(self):
+        if self.config.archive == "none": return None
+        from app.history_archive import HistoryArchive
+        return HistoryArchive(self.config.archive_dir, self.config.archive, self.config.archive_segment_bytes)
+
     def _register_observers(self):
         self.attach(LoggingObserver(self.logger))
-        self.attach(AutoSaveObserver(self.history, self.config))
+        self.autosave = AutoSaveObserver(self.history, self.config, self.scheduler)
+        # Journal entries must be written in the order the changes happen; a queued entry could also land after a
+        # compaction snapshot that already contains it. So with async observers the journal is still written inline.
+        if self.dispatcher and self.config.save_mode == "journal": self.inline_observers.append(self.autosave)
+        else: self.attach(self.autosave)
 
-    def attach(self, observer: Observer): self.observers.append(observer)
+    def attach(self, observer: Observer):
+        with self.lock: self.observers.append(observer)
     def _notify(self, event: str, data: any):
+        for observer in self.inline_observers: observer.update(event, data)
+        if self.dispatcher:
+            self.dispatcher.submit(event, data)
+            return
         for observer in self.observers: observer.update(event, data)
 
+    def _compute(self, op_name: str, a: float, b: float) -> float:
+        return round(OperationFactory.create(op_name).execute(a, b), self.config.precision)
+
     def execute_calculation(self, op_name: str, a: float, b: float):
-        operation = OperationFactory.create(op_name)
-        result = round(operation.execute(a, b), self.config.precision)
+        if self.cache is None:
+            result = self._compute(op_name, a, b)
+        else:
+            # Zero operands are keyed by repr so that -0.0 and 0.0 keep their distinct results.
+            key = (op_name, a, b, self.config.precision) if a and b else (op_name, repr(a), repr(b), self.config.precision)
+            result = self.cache.get_or_compute(key, lambda: self._compute(op_name, a, b))
+        return self.record_calculation(op_name, a, b, result)
+
+    def record_calculation(self, op_name: str, a: float, b: float, result: float):
+        # Adds a result computed elsewhere (cache miss path or a batch worker) as one undoable step.
         calc = Calculation(a, b, op_name, result)
-        self.history.add(calc)
-        self.caretaker.save()
-        self._notify("calculation", calc)
+        with self.lock:
+            self.history.add(calc)
+            self.caretaker.save()
+            self._notify("calculation", calc)
         return result
 
-    def undo(self): self.caretaker.undo(); print("Undo successful.")
-    def redo(self): self.caretaker.redo(); print("Redo successful.")
-    def show_history(self):
-        history_list = self.history.get_history()
-        if not history_list: print("History is empty.")
+    # NumPy is imported on first batch call so interactive startup does not pay for it.
+    def execute_batch(self, op_name: str, a_values, b_values) -> "BatchResult":
+        from app.batch import evaluate
+        return self._record_batch(evaluate(op_name, a_values, b_values, self.config.precision))
+
+    def execute_batch_mixed(self, op_names, a_values, b_values) -> "BatchResult":
+        from app.batch import evaluate
+        return self._record_batch(evaluate(list(op_names), a_values, b_values, self.config.precision))
+
+    @contextmanager
+    def deferred_autosave(self):
+        # Suspends per-calculation autosave and writes one snapshot when the block exits.
+        self.autosave.paused = True
+        try: yield
+        finally:
+            self.flush_observers()
+            with self.lock:
+                self.autosave.paused = False
+                if self.config.auto_save: self.history.save(self.config.history_filepath, self.config.encoding)
+
+    def _record_batch(self, batch: "BatchResult") -> "BatchResult":
+        ok = ~batch.errors
+        with self.lock:
+            self.history.add_many(batch.operand_a[ok].tolist(), batch.operand_b[ok].tolist(),
+                                  batch.op_names[ok].tolist(), batch.results[ok].tolist(), batch.timestamp)
+            self.caretaker.save()
+            self._notify("batch", batch)
+        return batch
+
+    def undo(self):
+        with self.lock: self.caretaker.undo(); self._notify("undo", None)
+        print("Undo successful.")
+    def redo(self):
+        with self.lock: self.caretaker.redo(); self._notify("redo", None)
+        print("Redo successful.")
+    def show_history(self, query: dict = None):
+        # The listing is rendered into one string so large histories cost a single write to the terminal.
+        if query and query.get("op_name"):
+            query = {**query, "op_name": OperationFactory.resolve(query["op_name"]) or query["op_name"]}
+        with self.lock:
+            if query:
+                total, calcs = self.history.query(**query)
+                if not total: print("No matching calculations."); return
+            else:
+                calcs = self.history.get_history()
+                if not calcs: print("History is empty."); return
+            lines = ["\n--- Calculation History ---", *(f"{calc.timestamp}: {calc}" for calc in calcs)]
+        if query and query.get("limit"):
+            pages = -(-total // query["limit"])
+            lines.append(f"Page {query.get('page', 1)} of {pages} ({total} matches)")
+        lines.append("--------------------------")
+        print("\n".join(lines))
+
+    def show_summary(self, op_name: str = None):
+        with self.lock: summary = self.history.summary()
+        if op_name:
+            name = OperationFactory.resolve(op_name) or op_name
+            if name not in summary["operations"]: print(f"No calculations for '{name}'."); return
+            rows = {name: summary["operations"][name]}
+        elif not summary["count"]:
+            print("History is empty."); return
         else:
-            print("\n--- Calculation History ---")
-            for calc in history_list:
-                print(f"{calc.timestamp}: {calc}")
-            print("--------------------------")
-    
-    def clear_history(self): self.history.clear(); self.caretaker.save(); print("History cleared.")
-    def save_history(self): self.history.save(self.config.history_filepath, self.config.encoding); print("History saved.")
-    def load_history(self): self.history.load(self.config.history_filepath, self.config.encoding); self.caretaker.save(); print("History loaded.")
+            rows = {**summary["operations"], "all": summary}
+        # min/max are None for a group with only NaN results.
+        cell = lambda value: f"{'-':>14}" if value is None else f"{value:>14.6g}"
+        lines = [f"{'operation':<12} {'count':>8} {'sum':>14} {'mean':>14} {'min':>14} {'max':>14}"]
+        for name, s in rows.items():
+            lines.append(f"{name:<12} {s['count']:>8} {cell(s['sum'])} {cell(s['mean'])} {cell(s['min'])} {cell(s['max'])}")
+        print("\n".join(lines))
+
+    def clear_history(self):
+        with self.lock: self.history.clear(); self.caretaker.save(); self._notify("clear", None)
+        print("History cleared.")
+    def flush_observers(self):
+        if self.dispatcher: self.dispatcher.flush()
+    # Observers are flushed before taking the lock: the dispatcher worker may need it to finish a save.
+    def save_history(self):
+        self.flush_observers()
+        with self.lock: self.history.save(self.config.history_filepath, self.config.encoding)
+        print("History saved.")
+    def export_history(self):
+        self.flush_observers()
+        with self.lock: self.history.export(self.config.csv_filepath, self.config.encoding)
+        print(f"History exported to {self.config.csv_filepath}.")
+    def load_history(self):
+        self.flush_observers()
+        with self.lock: self.history.load(self.config.history_filepath, self.config.encoding); self.caretaker.save()
+        self.logger.info(f"History loaded: {self.history.load_stats}"); print("History loaded.")
+    def stats(self) -> dict:
+        data = self.instrumentation.to_dict() if self.instrumentation else {}
+        if self.cache: data["cache"] = self.cache.stats()
+        if self.dispatcher: data["dispatcher"] = self.dispatcher.stats()
+        if self.history.archive is not None: data["archive"] = self.history.archive.stats()
+        data["autosave"] = self.history.save_stats.to_dict()
+        if self.scheduler: data["autosave"].update(self.scheduler.stats())
+        return data
+
+    def show_stats(self, action: str = "", path: str = None):
+        action = action.lower()
+        if action == "json":
+            text = json.dumps(self.stats(), indent=2)
+            if not path: print(text); return
+            with open(path, "w", encoding=self.config.encoding) as f: f.write(text)
+            print(f"Stats exported to {path}.")
+        elif action == "reset":
+            if self.instrumentation: self.instrumentation.reset()
+            print("Stats reset.")
+        elif action:
+            raise ValidationError("Usage: stats [json [file] | reset]")
+        else:
+            if self.instrumentation: print(self.instrumentation.report())
+            else: print("Instrumentation is disabled (set CALCULATOR_INSTRUMENTATION=true).")
+            if self.cache: print(f"Cache: {self.cache.stats()}")
+            if self.dispatcher: print(f"Dispatcher: {self.dispatcher.stats()}")
+            if self.history.archive is not None: print(f"Archive: {self.history.archive.stats()}")
+            print(f"Autosave: {self.history.save_stats}")
+
+    def close(self):
+        # Pending debounced state is written before the journal compaction below.
+        if self.dispatcher: self.dispatcher.close()
+        if self.scheduler: self.scheduler.close()
+        with self.lock:
+            if self.config.auto_save and self.config.save_mode == "journal" and self.history.journal_events:
+                self.history.save(self.config.history_filepath, self.config.encoding)
+            self.history.close()
+        stop_logger(self.logger)
 
 
 class REPL:
-    def __init__(self):
+    def __init__(self, app: CalculatorApp = None):
         try:
-            self.app = CalculatorApp()
+            self.app = app or CalculatorApp()
             self.commands = {
                 "history": self.display_history, "clear": self.clear_history,
                 "undo": self.undo, "redo": self.redo, "save": self.save,
-                "load": self.load, "help": self.display_help, "exit": self.exit
+                "load": self.load, "export": self.export, "stats": self.stats, "summary": self.summary,
+                "help": self.display_help, "exit": self.exit
             }
+            # Commands that take the rest of the input line as arguments.
+            self.arg_commands = {"history", "stats", "summary"}
         except CalculatorError as e:
             print(f"Initialization Error: {e}"); self.app = None
     
@@ -85,47 +290,64 @@ class REPL:
         self.display_help()
         while True:
             try:
-                user_input = input(">>> ").strip().lower()
+                user_input = input(">>> ").strip()
                 if not user_input: continue
                 parts = user_input.split()
-                cmd_name, args = parts[0], parts[1:]
+                cmd_name, args = parts[0].lower(), parts[1:]
                 self.execute_command(cmd_name, args)
-            except KeyboardInterrupt: print("\nExiting..."); break
+            except KeyboardInterrupt: self.app.close(); print("\nExiting..."); break
             except Exception as e:
                 self.app.logger.error(f"An unexpected REPL error: {e}", exc_info=True)
                 print("An unexpected error occurred. Please check logs.")
+                self.app.close()
                 break
 
     def execute_command(self, cmd_name: str, args: list):
         try:
-            if cmd_name in OperationFactory.get_operations():
-                a, b = validate_operands(args, self.app.config.max_input)
-                result = self.app.execute_calculation(cmd_name, a, b)
-                print(f"Result: {result}")
+            # Built-in commands are matched first, so they never trigger plugin discovery or get shadowed.
+            if cmd_name in self.arg_commands:
+                self.commands[cmd_name](*args)
             elif cmd_name in self.commands:
                 self.commands[cmd_name]()
+            elif op_name := OperationFactory.resolve(cmd_name):
+                a, b = validate_operands(args, self.app.config.max_input)
+                result = self.app.execute_calculation(op_name, a, b)
+                print(f"Result: {result}")
             else:
                 print(f"Unknown command: '{cmd_name}'")
         except (CalculatorError, IndexError) as e:
             print(f"Error: {e}")
 
-    def display_history(self): self.app.show_history()
+    def display_history(self, *args):
+        if args: self.app.show_history(parse_history_query(list(args)))
+        else: self.app.show_history()
     def clear_history(self): self.app.clear_history()
     def undo(self): self.app.undo()
     def redo(self): self.app.redo()
     def save(self): self.app.save_history()
     def load(self): self.app.load_history()
+    def export(self): self.app.export_history()
+    def stats(self, *args):
+        if len(args) > 2: raise ValidationError("Usage: stats [json [file] | reset]")
+        self.app.show_stats(*args)
+    def summary(self, *args):
+        if len(args) > 1: raise ValidationError("Usage: summary [operation]")
+        self.app.show_summary(*args)
     def exit(self): raise KeyboardInterrupt
 
     def display_help(self):
         print("\nAvailable Commands:")
         for op in OperationFactory.get_operations():
             print(f"  {op:<12} <a> <b>")
+        print(f"  Aliases: {' '.join(f'{alias}={name}' for alias, name in OperationFactory.get_aliases().items())}")
         # Description map for help text
         descriptions = {
-            "history": "Display calculation history.", "clear": "Clear calculation history.",
+            "history": "Display or query history (--op, --result '>100', --since, --until, --limit, --page, --archive).",
+            "clear": "Clear calculation history.",
             "undo": "Undo the last calculation.", "redo": "Redo the last undone calculation.",
             "save": "Manually save history.", "load": "Manually load history.",
+            "export": "Export history to CSV.",
+            "summary": "Show count, sum, mean, min and max of results (summary [operation]).", "stats": "Show timing stats (stats json [file] | stats reset).",
             "help": "Display this help menu.", "exit": "Exit the application gracefully."
         }
         for name, func in self.commands.items():
@@ -10,9 +10,45 @@ class CalculatorConfig:
         self.precision = self._get_env_as_int('CALCULATOR_PRECISION', 4)
         self.max_input = self._get_env_as_float('CALCULATOR_MAX_INPUT_VALUE', 1e9)
         self.encoding = os.getenv('CALCULATOR_DEFAULT_ENCODING', 'utf-8')
+        self.cache_size = self._get_env_as_int('CALCULATOR_CACHE_SIZE', 0)
+        self.max_undo = self._get_env_as_int('CALCULATOR_MAX_UNDO_DEPTH', 1000)
+        self.save_mode = self._get_env_as_choice('CALCULATOR_SAVE_MODE', 'journal', ('journal', 'snapshot'))
+        self.journal_compact_every = self._get_env_as_int('CALCULATOR_JOURNAL_COMPACT_EVERY', 1000)
 
 
-        self.history_filepath = os.path.join(self.history_dir, "calculation_history.csv")
+        self.observer_mode = self._get_env_as_choice('CALCULATOR_OBSERVER_MODE', 'sync', ('sync', 'async'))
+        self.observer_queue_size = self._get_env_as_int('CALCULATOR_OBSERVER_QUEUE_SIZE', 1024)
+        self.observer_backpressure = self._get_env_as_choice(
+            'CALCULATOR_OBSERVER_BACKPRESSURE', 'block', ('block', 'drop', 'coalesce'))
+        self.log_max_bytes = self._get_env_as_int('CALCULATOR_LOG_MAX_BYTES', 5 * 1024 * 1024)
+        self.log_backup_count = self._get_env_as_int('CALCULATOR_LOG_BACKUP_COUNT', 5)
+        self.log_rotate_when = os.getenv('CALCULATOR_LOG_ROTATE_WHEN', '')
+        self.log_format = self._get_env_as_choice('CALCULATOR_LOG_FORMAT', 'text', ('text', 'json'))
+        self.log_sample_rate = self._get_env_as_float('CALCULATOR_LOG_SAMPLE_RATE', 1.0)
+        self.batch_workers = self._get_env_as_int('CALCULATOR_BATCH_WORKERS', 1)
+        self.batch_chunk_size = self._get_env_as_int('CALCULATOR_BATCH_CHUNK_SIZE', 5000)
+        self.thread_safe = self._get_env_as_bool('CALCULATOR_THREAD_SAFE', "false")
+        self.instrumentation = self._get_env_as_bool('CALCULATOR_INSTRUMENTATION', "false")
+        self.autosave_debounce = self._get_env_as_float('CALCULATOR_AUTOSAVE_DEBOUNCE', 0.0)
+        self.autosave_max_delay = self._get_env_as_float('CALCULATOR_AUTOSAVE_MAX_DELAY', 5.0)
+        self.fsync_policy = self._get_env_as_choice('CALCULATOR_FSYNC_POLICY', 'interval', ('never', 'interval', 'always'))
+        self.fsync_interval = self._get_env_as_float('CALCULATOR_FSYNC_INTERVAL', 1.0)
+        self.history_format = self._get_env_as_choice('CALCULATOR_HISTORY_FORMAT', 'csv', ('csv', 'binary', 'sqlite'))
+        self.multi_writer = self._get_env_as_bool('CALCULATOR_MULTI_WRITER', "false")
+        if self.multi_writer and self.history_format != 'csv':
+            raise ValueError("CALCULATOR_MULTI_WRITER requires CALCULATOR_HISTORY_FORMAT=csv.")
+        # Callers notify observers while holding the shared history lock, which a snapshot save on the observer
+        # worker would need: with a full queue the two would wait on each other.
+        if self.multi_writer and self.observer_mode == 'async' and self.save_mode == 'snapshot':
+            raise ValueError("CALCULATOR_MULTI_WRITER cannot be combined with async observers in snapshot save mode.")
+        self.archive = self._get_env_as_choice('CALCULATOR_ARCHIVE', 'none', ('none', 'gzip', 'lzma'))
+        self.archive_segment_bytes = self._get_env_as_int('CALCULATOR_ARCHIVE_SEGMENT_BYTES', 1024 * 1024)
+        if self.archive != 'none' and self.multi_writer:
+            raise ValueError("CALCULATOR_ARCHIVE cannot be combined with CALCULATOR_MULTI_WRITER.")
+        self.archive_dir = os.path.join(self.history_dir, "archive")
+        self.csv_filepath = os.path.join(self.history_dir, "calculation_history.csv")
+        self.history_filepath = os.path.join(
+            self.history_dir, "calculation_history" + {"csv": ".csv", "binary": ".bin", "sqlite": ".db"}[self.history_format])
         os.makedirs(self.log_dir, exist_ok=True)
         os.makedirs(self.history_dir, exist_ok=True)
 
@@ -24,6 +60,11 @@ class CalculatorConfig:
         try: return float(os.getenv(name, default))
         except (ValueError, TypeError): raise ValueError(f"Invalid value for {name}. Must be a float.")
 
+    def _get_env_as_choice(self, name, default, choices):
+        val = str(os.getenv(name, default)).lower()
+        if val in choices: return val
+        raise ValueError(f"Invalid value for {name}: {val}. Must be one of {', '.join(choices)}.")
+
     def _get_env_as_bool(self, name, default):
         val = str(os.getenv(name, default)).lower()
         if val in ('true', '1', 't', 'y', 'yes'): return True
@@ -1,32 +1,42 @@
+from collections import deque
 from app.history import HistoryManager
 
 class Memento:
     def __init__(self, state: list):
-        self._state = state.copy()
+        self._state = state
     def get_state(self) -> list:
         return self._state
 
 class Caretaker:
-    def __init__(self, originator: HistoryManager):
+    # Each memento holds only the history changes made since the previous save.
+    def __init__(self, originator: HistoryManager, max_undo: int = 0):
         self._originator = originator
-        self._undo_mementos: list[Memento] = []
+        self._undo_mementos: deque[Memento] = deque(maxlen=max_undo + 1 if max_undo > 0 else None)
         self._redo_mementos: list[Memento] = []
 
     def save(self):
-        memento = Memento(self._originator.get_history())
+        memento = Memento(self._originator.take_changes())
         self._undo_mementos.append(memento)
         self._redo_mementos.clear()
 
+    def _discard_unsaved(self):
+        for change in reversed(self._originator.take_changes()):
+            self._originator.revert(change)
+
     def undo(self):
         if len(self._undo_mementos) <= 1:
             raise IndexError("Cannot undo: No previous state.")
+        self._discard_unsaved()
         current_memento = self._undo_mementos.pop()
+        for change in reversed(current_memento.get_state()):
+            self._originator.revert(change)
         self._redo_mementos.append(current_memento)
-        self._originator.set_history(self._undo_mementos[-1].get_state())
 
     def redo(self):
         if not self._redo_mementos:
             raise IndexError("Cannot redo: No future state.")
+        self._discard_unsaved()
         memento_to_restore = self._redo_mementos.pop()
+        for change in memento_to_restore.get_state():
+            self._originator.apply(change)
         self._undo_mementos.append(memento_to_restore)
-        self._originator.set_history(memento_to_restore.get_state())
\ No newline at end of file
@@ -0,0 +1,99 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+class LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        mean = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "mean_ms": mean * 1000, "max_ms": self.max * 1000}
+
+
+class AsyncDispatcher:
+    # Delivers observer events from a bounded queue on a background worker thread.
+    # When the queue is full, "block" waits for space, "drop" discards the new event and
+    # "coalesce" discards the oldest queued one; any loss is followed by a "resync" event
+    # so observers that mirror state (autosave) can catch up with one full write.
+    POLICIES = ("block", "drop", "coalesce")
+
+    def __init__(self, observers: list, maxsize: int = 1024, policy: str = "block", logger=None):
+        if policy not in self.POLICIES: raise ValueError(f"Unknown backpressure policy: '{policy}'")
+        self._observers, self.maxsize, self.policy, self._logger = observers, max(maxsize, 1), policy, logger
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._lost = False
+        self._closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.latency: dict[str, LatencyStats] = {}
+        self._thread = threading.Thread(target=self._run, name="observer-dispatch", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, event: str, data):
+        with self._cond:
+            if self._closed: raise RuntimeError("Dispatcher is closed.")
+            while len(self._queue) >= self.maxsize:
+                if self.policy == "block":
+                    self._cond.wait()
+                    continue
+                self._lost = True
+                if self.policy == "drop":
+                    self.dropped += 1
+                    return
+                self._queue.popleft()
+                self._unfinished -= 1
+                self.coalesced += 1
+            self._queue.append((event, data))
+            self._unfinished += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed: self._cond.wait()
+                if not self._queue: return
+                event, data = self._queue.popleft()
+                resync, self._lost = self._lost, False
+                self._cond.notify_all()
+            if resync: self._deliver("resync", None)
+            self._deliver(event, data)
+            with self._cond:
+                self._unfinished -= 1
+                self._cond.notify_all()
+
+    def _deliver(self, event: str, data):
+        for observer in list(self._observers):
+            start = time.perf_counter()
+            try:
+                observer.update(event, data)
+            except Exception as e:
+                if self._logger: self._logger.error(f"Observer {type(observer).__name__} failed: {e}", exc_info=True)
+            self.latency.setdefault(type(observer).__name__, LatencyStats()).record(time.perf_counter() - start)
+
+    def flush(self, timeout: float = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self):
+        with self._cond:
+            if self._closed: return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queue), "dropped": self.dropped, "coalesced": self.coalesced,
+                "observers": {name: stats.to_dict() for name, stats in self.latency.items()}}
@@ -1,44 +1,846 @@
-import pandas as pd
+import csv
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, deque
+from collections.abc import Sequence
+from contextlib import nullcontext
+from itertools import repeat
+from math import inf, nan
+from operator import itemgetter
+import time
 from app.calculation import Calculation
+from app.history_store import FIELDS, HistoryStore, file_lock, fsync_directory, fsync_path, open_store, to_iso
+
+def journal_path(file_path) -> str:
+    return os.path.splitext(str(file_path))[0] + ".journal"
+
+def lock_path(file_path) -> str:
+    return os.path.splitext(str(file_path))[0] + ".lock"
+
+_row_time = itemgetter(4)
+
+
+class LoadStats:
+    def __init__(self, rows: int = 0, bytes_read: int = 0, file_size: int = 0, journal_events: int = 0, seconds: float = 0.0):
+        self.rows, self.bytes_read, self.file_size = rows, bytes_read, file_size
+        self.journal_events, self.seconds = journal_events, seconds
+
+    def __str__(self):
+        return (f"{self.rows} rows from {self.bytes_read}/{self.file_size} bytes, "
+                f"{self.journal_events} journal events in {self.seconds * 1000:.1f} ms")
+
+
+class SaveStats:
+    def __init__(self):
+        self.snapshots = 0
+        self.appends = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+
+    def to_dict(self) -> dict:
+        return {"snapshots": self.snapshots, "appends": self.appends, "bytes_written": self.bytes_written,
+                "fsyncs": self.fsyncs}
+
+    def __str__(self):
+        return (f"{self.snapshots} snapshots, {self.appends} appends, {self.bytes_written} bytes written, "
+                f"{self.fsyncs} fsyncs")
+
+
+def _in_range(value: float, bounds: tuple) -> bool:
+    lo, lo_inclusive, hi, hi_inclusive = bounds
+    if lo is not None and (value < lo if lo_inclusive else value <= lo): return False
+    return hi is None or (value <= hi if hi_inclusive else value < hi)
+
+def _range_slice(entries: list, bounds: tuple) -> list:
+    # entries are sorted (value, seq) pairs; returns the slice whose values fall within bounds.
+    lo, lo_inclusive, hi, hi_inclusive = bounds
+    inf = float("inf")
+    start = 0 if lo is None else bisect_left(entries, (lo, -inf)) if lo_inclusive else bisect_right(entries, (lo, inf))
+    end = len(entries) if hi is None else bisect_right(entries, (hi, inf)) if hi_inclusive else bisect_left(entries, (hi, -inf))
+    return entries[start:end]
+
+
+class _HistoryIndex:
+    # Secondary indexes over one ring, keyed by row sequence number: a posting deque per op code and
+    # (value, seq) lists sorted by result and by timestamp. Kept in step with every ring mutation.
+    def __init__(self, ring: "_RingBuffer"):
+        self.by_op: dict[int, deque] = {}
+        self.by_result, self.by_ts = [], []
+        for i in range(ring.size):
+            row, seq = ring.row(i), ring.first + i
+            self.by_op.setdefault(row[2], deque()).append(seq)
+            self.by_result.append((row[3], seq))
+            self.by_ts.append((row[4], seq))
+        self.by_result.sort()
+        self.by_ts.sort()
+
+    def insert(self, seq: int, row: tuple, front: bool = False):
+        postings = self.by_op.setdefault(row[2], deque())
+        if front: postings.appendleft(seq)
+        else: postings.append(seq)
+        insort(self.by_result, (row[3], seq))
+        insort(self.by_ts, (row[4], seq))
+
+    def discard(self, seq: int, row: tuple, front: bool = False):
+        postings = self.by_op[row[2]]
+        if front: postings.popleft()
+        else: postings.pop()
+        del self.by_result[bisect_left(self.by_result, (row[3], seq))]
+        del self.by_ts[bisect_left(self.by_ts, (row[4], seq))]
+
+    def search(self, ring: "_RingBuffer", op_code: int = None, result: tuple = None, period: tuple = None) -> list[int]:
+        # Scans the smallest candidate list and checks the other filters against the ring rows.
+        candidates = []
+        if op_code is not None: candidates.append(self.by_op.get(op_code, ()))
+        if result is not None: candidates.append(_range_slice(self.by_result, result))
+        if period is not None: candidates.append(_range_slice(self.by_ts, period))
+        if not candidates: return list(range(ring.first, ring.first + ring.size))
+        smallest = min(candidates, key=len)
+        seqs = smallest if smallest is candidates[0] and op_code is not None else sorted(seq for _, seq in smallest)
+        matches = []
+        for seq in seqs:
+            _, _, op, value, ts = ring.row(seq - ring.first)
+            if op_code is not None and op != op_code: continue
+            if result is not None and not _in_range(value, result): continue
+            if period is not None and not _in_range(ts, period): continue
+            matches.append(seq)
+        return matches
+
+
+class _Aggregate:
+    # Running count, sum and sorted results of a group of rows. remove() is the exact inverse of add(), so
+    # evictions and undo keep it in step; the sum is Neumaier-compensated so removals do not accumulate drift.
+    # NaN and infinite results are only counted, never summed, so the totals recover once those rows leave;
+    # NaN is also kept out of `values`, where it would break the ordering.
+    __slots__ = ("count", "total", "compensation", "values", "nans", "pos_inf", "neg_inf")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.compensation = 0.0
+        self.values: list[float] = []
+        self.nans = self.pos_inf = self.neg_inf = 0
+
+    def _accumulate(self, value: float):
+        total = self.total + value
+        if abs(self.total) >= abs(value): self.compensation += (self.total - total) + value
+        else: self.compensation += (value - total) + self.total
+        self.total = total
+
+    def add(self, value: float):
+        self.count += 1
+        if value != value:
+            self.nans += 1
+            return
+        insort(self.values, value)
+        if value == inf: self.pos_inf += 1
+        elif value == -inf: self.neg_inf += 1
+        else: self._accumulate(value)
+
+    def remove(self, value: float):
+        self.count -= 1
+        if value != value:
+            self.nans -= 1
+            return
+        del self.values[bisect_left(self.values, value)]
+        if value == inf: self.pos_inf -= 1
+        elif value == -inf: self.neg_inf -= 1
+        elif len(self.values) > self.pos_inf + self.neg_inf: self._accumulate(-value)
+        else: self.total = self.compensation = 0.0
+
+    def to_dict(self) -> dict:
+        if self.nans or (self.pos_inf and self.neg_inf): total = nan
+        elif self.pos_inf or self.neg_inf: total = inf if self.pos_inf else -inf
+        else: total = self.total + self.compensation
+        return {"count": self.count, "sum": total, "mean": total / self.count if self.count else 0.0,
+                "min": self.values[0] if self.values else None, "max": self.values[-1] if self.values else None}
+
+
+class _HistoryAggregates:
+    # Result statistics over one ring, overall and per op code. Like _HistoryIndex it is built on first use
+    # and then updated by every ring mutation, so each ring a clear/undo swaps in keeps its own totals.
+    def __init__(self, ring: "_RingBuffer"):
+        self.overall = _Aggregate()
+        self.by_op: dict[int, _Aggregate] = {}
+        for i in range(ring.size): self.insert(ring.row(i))
+
+    def insert(self, row: tuple):
+        self.overall.add(row[3])
+        aggregate = self.by_op.get(row[2])
+        if aggregate is None: aggregate = self.by_op[row[2]] = _Aggregate()
+        aggregate.add(row[3])
+
+    def discard(self, row: tuple):
+        self.overall.remove(row[3])
+        self.by_op[row[2]].remove(row[3])
+
+
+class _RingBuffer:
+    # Fixed-capacity columns; a row is (operand_a, operand_b, op_code, result, epoch timestamp).
+    # `first` is the sequence number of the oldest row; `index` is built on the first query and
+    # `aggregates` on the first summary.
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 0)
+        self.a = array('d', bytes(8 * self.capacity))
+        self.b = array('d', bytes(8 * self.capacity))
+        self.op = array('H', bytes(2 * self.capacity))
+        self.result = array('d', bytes(8 * self.capacity))
+        self.ts = array('d', bytes(8 * self.capacity))
+        self.head = 0
+        self.size = 0
+        self.version = 0
+        self.first = 0
+        self.index: _HistoryIndex = None
+        self.aggregates: _HistoryAggregates = None
+
+    def __len__(self): return self.size
+
+    def fill(self, a: array, b: array, op: array, result: array, ts: array):
+        # Bulk-load an empty buffer from equally sized columns, keeping only the newest rows that fit.
+        n = min(len(a), self.capacity)
+        for column, values in ((self.a, a), (self.b, b), (self.op, op), (self.result, result), (self.ts, ts)):
+            column[:n] = values[len(values) - n:]
+        self.head, self.size = 0, n
+        self.version += 1
+        self.index = self.aggregates = None
+
+    def row(self, index: int) -> tuple:
+        i = (self.head + index) % self.capacity
+        return self.a[i], self.b[i], self.op[i], self.result[i], self.ts[i]
+
+    def _write(self, i: int, row: tuple):
+        self.a[i], self.b[i], self.op[i], self.result[i], self.ts[i] = row
+
+    def push_back(self, row: tuple):
+        self.version += 1
+        if self.capacity == 0: return row
+        if self.size == self.capacity:
+            evicted = self.row(0)
+            self._write(self.head, row)
+            self.head = (self.head + 1) % self.capacity
+            if self.index:
+                self.index.discard(self.first, evicted, front=True)
+                self.index.insert(self.first + self.size, row)
+            if self.aggregates:
+                self.aggregates.discard(evicted)
+                self.aggregates.insert(row)
+            self.first += 1
+            return evicted
+        self._write((self.head + self.size) % self.capacity, row)
+        if self.index: self.index.insert(self.first + self.size, row)
+        if self.aggregates: self.aggregates.insert(row)
+        self.size += 1
+        return None
+
+    def pop_back(self) -> tuple:
+        if self.size == 0: return None
+        self.version += 1
+        row = self.row(self.size - 1)
+        self.size -= 1
+        if self.index: self.index.discard(self.first + self.size, row)
+        if self.aggregates: self.aggregates.discard(row)
+        return row
+
+    def push_front(self, row: tuple):
+        if self.capacity == 0: return
+        self.version += 1
+        self.head = (self.head - 1) % self.capacity
+        self._write(self.head, row)
+        self.size += 1
+        self.first -= 1
+        if self.index: self.index.insert(self.first, row, front=True)
+        if self.aggregates: self.aggregates.insert(row)
+
+    def segments(self, column: array) -> tuple:
+        view = memoryview(column).toreadonly()
+        end = self.head + self.size
+        if end <= self.capacity: return (view[self.head:end],)
+        return view[self.head:], view[:end - self.capacity]
+
+
+class HistoryView(Sequence):
+    # Read-only view over the history; Calculation objects are built only when indexed.
+    def __init__(self, ring: _RingBuffer, op_names: list[str]):
+        self._ring, self._op_names, self._version = ring, op_names, ring.version
+
+    def __len__(self): return self._ring.size
+
+    def __getitem__(self, index):
+        if self._ring.version != self._version:
+            raise RuntimeError("History changed after this view was created.")
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("History index out of range.")
+        a, b, op, result, ts = self._ring.row(index)
+        return Calculation(a, b, self._op_names[op], result, ts)
+
+    @property
+    def op_names(self) -> list[str]:
+        return self._op_names
+
+    def column(self, name: str) -> tuple:
+        # Zero-copy segments in insertion order; operation_name yields codes into op_names.
+        columns = {"operand_a": self._ring.a, "operand_b": self._ring.b, "operation_name": self._ring.op,
+                   "result": self._ring.result, "timestamp": self._ring.ts}
+        return self._ring.segments(columns[name])
+
+    def to_array(self, name: str) -> array:
+        segments = self.column(name)
+        result = array(segments[0].format)
+        for segment in segments: result.frombytes(segment.cast("B"))
+        return result
+
+    def values(self, name: str) -> list:
+        return [x for segment in self.column(name) for x in segment]
+
+
+class SharedLock:
+    # Multi-writer mode: the history lock plus an exclusive flock on the sidecar lock file. Entering merges
+    # whatever other processes wrote, so the holder always changes the latest shared state. Reentrant, which
+    # lets it wrap whole app commands as well as the saves inside them.
+    def __init__(self, history: "HistoryManager", file_path, encoding: str):
+        self._history, self.file_path, self.encoding = history, str(file_path), encoding
+        self._depth = 0
+        self._held = None
+
+    def __enter__(self):
+        self._history.lock.acquire()
+        if self._depth == 0:
+            try:
+                self._held = file_lock(lock_path(self.file_path))
+                self._held.__enter__()
+                self._history._sync(self._history._store(self.file_path, self.encoding))
+            except BaseException:
+                if self._held: self._held.__exit__(None, None, None)
+                self._history.lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            held, self._held = self._held, None
+            held.__exit__(None, None, None)
+        self._history.lock.release()
+
+
+class _ArchiveRows:
+    def __init__(self, archive): self._archive = archive
+    def __len__(self): return len(self._archive)
+    def __getitem__(self, index: slice) -> list[tuple]: return self._archive.rows(index.start, index.stop)
+
 
 class HistoryManager:
-    def __init__(self, max_history: int):
+    FSYNC_POLICIES = ("never", "interval", "always")
+
+    def __init__(self, max_history: int, thread_safe: bool = False, fsync_policy: str = "never",
+                 fsync_interval: float = 1.0, multi_writer: bool = False, archive=None):
+        if fsync_policy not in self.FSYNC_POLICIES: raise ValueError(f"Unknown fsync policy: '{fsync_policy}'")
+        # Public entry points hold `lock`, so a background saver never sees a half-applied change.
+        self.lock = threading.RLock() if thread_safe or multi_writer else nullcontext()
+        # Multi-writer mode shares one CSV file between processes: calculations are appended under a file lock
+        # and other processes' rows are merged by timestamp. `_synced` is the (inode, size, mtime) last seen,
+        # `_shared_offset` the byte up to which the file has been read and `_anchor` the bytes just before it.
+        self.multi_writer = multi_writer
+        # Rows evicted from the front of the ring go to `archive` when one is attached, instead of being dropped.
+        self.archive = archive
+        self._synced = None
+        self._shared_offset = 0
+        self._anchor = b""
+        self._shared_locks: dict[str, SharedLock] = {}
+        self.fsync_policy, self.fsync_interval = fsync_policy, fsync_interval
+        self._last_fsync = 0.0
+        # Paths written inside an fsync interval, synced by `_fsync_timer` when the interval ends.
+        self._unsynced: set[str] = set()
+        self._fsync_timer: threading.Timer = None
+        self._fsync_lock = threading.Lock()
+        self.save_stats = SaveStats()
         self._max_history = max_history
-        self._history: list[Calculation] = []
+        self._ring = _RingBuffer(max_history)
+        self._op_names: list[str] = []
+        self._op_codes: dict[str, int] = {}
+        self._changes: list[tuple] = []
+        # Changes written to the journal since the last snapshot that a replay can still undo/redo.
+        self._journal_undo = 0
+        self._journal_redo = 0
+        self._journal_events = 0
+        self.load_stats = LoadStats()
+        self._stores: dict[str, HistoryStore] = {}
+        # Once an incremental store is open, undo/redo log the rows they remove and restore here, so the next
+        # record() can edit the store instead of rewriting it; ("rewrite", None) marks a clear or load.
+        self._store_edits: list[tuple] = None
+
+    def _fsync_due(self, *paths: str) -> bool:
+        # "interval" syncs a write right away only when the previous sync is at least fsync_interval seconds old.
+        # Otherwise `paths` are synced by a timer when the interval ends, so no write stays unsynced for longer.
+        if self.fsync_policy == "never": return False
+        now = time.monotonic()
+        if self.fsync_policy == "interval" and now - self._last_fsync < self.fsync_interval:
+            self._defer_fsync(paths, self._last_fsync + self.fsync_interval - now)
+            return False
+        self._last_fsync = now
+        self.save_stats.fsyncs += 1
+        return True
+
+    def _defer_fsync(self, paths, delay: float):
+        with self._fsync_lock:
+            self._unsynced.update(paths)
+            if self._fsync_timer is None:
+                self._fsync_timer = threading.Timer(delay, self._sync_deferred)
+                self._fsync_timer.daemon = True
+                self._fsync_timer.start()
+
+    def _sync_deferred(self):
+        with self._fsync_lock:
+            paths, self._unsynced, self._fsync_timer = self._unsynced, set(), None
+        if not paths: return
+        for path in paths: fsync_path(path)
+        # Snapshots are renamed into place, so their directories are synced too.
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in paths}: fsync_directory(directory)
+        self._last_fsync = time.monotonic()
+        self.save_stats.fsyncs += 1
+
+    def _op_code(self, op_name: str) -> int:
+        code = self._op_codes.get(op_name)
+        if code is None:
+            code = self._op_codes[op_name] = len(self._op_names)
+            self._op_names.append(op_name)
+        return code
+
+    def _to_row(self, calc: Calculation) -> tuple:
+        return (float(calc.operand_a), float(calc.operand_b), self._op_code(calc.operation_name),
+                float(calc.result), calc.created)
+
+    def _to_ring(self, rows) -> _RingBuffer:
+        ring = _RingBuffer(self._max_history)
+        for row in rows: ring.push_back(row)
+        return ring
+
+    @staticmethod
+    def _ring_rows(ring: _RingBuffer) -> list[tuple]:
+        return [ring.row(i) for i in range(ring.size)]
+
+    def _rebuild(self, rows) -> _RingBuffer:
+        # Timestamp order; the sort is stable, so rows with equal timestamps keep their order.
+        return self._to_ring(sorted(rows, key=_row_time))
+
+    def _push(self, row: tuple) -> tuple:
+        # Returns the evicted row. Rows merged from other writers can be newer than a local one; in multi-writer
+        # mode such a row is placed in timestamp order instead of at the end.
+        ring = self._ring
+        if self.multi_writer and ring.size and row[4] < ring.row(ring.size - 1)[4]:
+            rows = self._ring_rows(ring) + [row]
+            rows.sort(key=_row_time)
+            self._ring = self._to_ring(rows)
+            evicted = rows[0] if len(rows) > ring.capacity else None
+        else:
+            evicted = ring.push_back(row)
+        if evicted is not None and self.archive is not None: self.archive.evict(self._named(evicted))
+        return evicted
+
+    def _named(self, row: tuple) -> tuple:
+        a, b, op, result, ts = row
+        return a, b, self._op_names[op], result, ts
+
+    def _edit_store(self, kind: str, rows):
+        if self._store_edits is not None: self._store_edits.extend((kind, self._named(row)) for row in rows)
+
+    def _evict_rows(self, payload: tuple, restore: bool = False):
+        # payload of an "evict" change: the replaced ring and the batch rows that never fit into the new one.
+        if self.archive is None: return
+        ring, head = payload
+        rows = [*map(self._named, self._ring_rows(ring)), *map(self._named, head)]
+        if restore:
+            for row in reversed(rows): self.archive.restore(row)
+        else:
+            for row in rows: self.archive.evict(row)
 
     def add(self, calculation: Calculation):
-        self._history.append(calculation)
-        if len(self._history) > self._max_history:
-            self._history.pop(0)
+        with self.lock:
+            row = self._to_row(calculation)
+            self._changes.append(("add", row, self._push(row)))
+
+    def add_many(self, operand_a, operand_b, op_names, results, timestamp: float):
+        with self.lock:
+            rows = list(zip(operand_a, operand_b, map(self._op_code, op_names), results, repeat(timestamp)))
+            if len(rows) > self._ring.capacity:
+                cut = len(rows) - self._ring.capacity
+                change = ("evict", (self._ring, rows[:cut]), self._to_ring(rows[cut:]))
+                self._evict_rows(change[1])
+                self._changes.append(change)
+                self._ring = change[2]
+            else:
+                for row in rows: self._changes.append(("add", row, self._push(row)))
+
+    def get_history(self) -> HistoryView:
+        return HistoryView(self._ring, self._op_names)
+
+    def __len__(self): return self._ring.size
 
-    def get_history(self) -> list[Calculation]:
-        return self._history.copy()
+    def query(self, op_name: str = None, result: tuple = None, since: float = None, until: float = None,
+              limit: int = None, page: int = 1, archive: bool = False) -> tuple[int, list[Calculation]]:
+        # Returns the match count and one page of matches, oldest first; page 1 holds the newest `limit` matches.
+        # result is (low, low_inclusive, high, high_inclusive) with None for an open end; since/until are inclusive.
+        # archive=True also covers archived rows, which precede the live ones.
+        with self.lock:
+            ring = self._ring
+            if ring.index is None: ring.index = _HistoryIndex(ring)
+            op_code = None if op_name is None else self._op_codes.get(op_name, -1)
+            period = None if since is None and until is None else (since, True, until, True)
+            seqs = ring.index.search(ring, op_code, result, period)
+            archived = self._search_archive(op_name, result, period) if archive and self.archive is not None else []
+            total, skip = len(archived) + len(seqs), len(archived)
+            if limit:
+                end = max(total - (page - 1) * limit, 0)
+                start = max(end - limit, 0)
+            else:
+                start, end = 0, total
+            view = self.get_history()
+            return total, ([Calculation(*row) for row in archived[start:min(end, skip)]] +
+                           [view[seq - ring.first] for seq in seqs[max(start - skip, 0):max(end - skip, 0)]])
+
+    def summary(self) -> dict:
+        # Count, sum, mean, min and max of the live results, overall and per operation. The aggregates are
+        # kept in step with every change, so this is O(1) in the history size once built for the current ring.
+        with self.lock:
+            ring = self._ring
+            if ring.aggregates is None: ring.aggregates = _HistoryAggregates(ring)
+            return {**ring.aggregates.overall.to_dict(),
+                    "operations": dict(sorted((self._op_names[op], aggregate.to_dict())
+                                              for op, aggregate in ring.aggregates.by_op.items() if aggregate.count))}
+
+    def _search_archive(self, op_name: str, result: tuple, period: tuple):
+        # Unfiltered reads stay lazy: slicing decompresses only the segments a page touches.
+        if op_name is None and result is None and period is None: return _ArchiveRows(self.archive)
+        since, _, until, _ = period or (None, True, None, True)
+        return [row for row in self.archive.scan(since, until)
+                if (op_name is None or row[2] == op_name) and (result is None or _in_range(row[3], result))
+                and (period is None or _in_range(row[4], period))]
 
     def set_history(self, history: list[Calculation]):
-        self._history = history.copy()
+        with self.lock:
+            self._replace(self._to_ring(map(self._to_row, history)))
 
     def clear(self):
-        self._history.clear()
+        with self.lock:
+            self._replace(self._to_ring(()))
 
-    def save(self, file_path: str, encoding: str):
-        if not self._history:
-            df = pd.DataFrame(columns=["operand_a", "operand_b", "operation_name", "result", "timestamp"])
-        else:
-            df = pd.DataFrame([calc.to_dict() for calc in self._history])
+    def _replace(self, ring: _RingBuffer):
+        self._changes.append(("set", self._ring, ring))
+        self._ring = ring
+
+    def take_changes(self) -> list[tuple]:
+        with self.lock:
+            changes, self._changes = self._changes, []
+            return changes
+
+    # Changes are applied and reverted strictly in LIFO order, so the buffers they reference never need copying.
+    # Rows merged from other writers are not changes; in multi-writer mode they can sit after a reverted row or
+    # newer than a reapplied one, in which case the ring is rebuilt around them.
+    def apply(self, change: tuple):
+        with self.lock:
+            kind, payload, new = change
+            if kind == "add":
+                self._push(payload)
+                self._edit_store("insert", (payload,))
+            elif kind == "evict":
+                self._ring = self._swap(payload[0], new)
+                self._evict_rows(payload)
+                self._edit_store("insert", [*payload[1], *self._ring_rows(new)])
+            elif kind == "group":
+                for sub_change in payload: self.apply(sub_change)
+            else:
+                self._ring = self._swap(payload, new)
+                if self._store_edits is not None: self._store_edits.append(("rewrite", None))
+
+    def revert(self, change: tuple):
+        with self.lock:
+            # For a "set" change the third item is the buffer that replaced `payload`.
+            kind, payload, evicted = change
+            if kind == "add":
+                ring = self._ring
+                if self.multi_writer and ring.size and ring.row(ring.size - 1) != payload:
+                    rows = self._ring_rows(ring)
+                    if payload in rows: del rows[len(rows) - 1 - rows[::-1].index(payload)]
+                    self._ring = self._rebuild(rows if evicted is None else [evicted, *rows])
+                else:
+                    ring.pop_back()
+                    if evicted is not None: ring.push_front(evicted)
+                if evicted is not None and self.archive is not None: self.archive.restore(self._named(evicted))
+                self._edit_store("delete", (payload,))
+            elif kind == "evict":
+                self._edit_store("delete", reversed([*payload[1], *self._ring_rows(evicted)]))
+                self._ring = self._swap(evicted, payload[0])
+                self._evict_rows(payload, restore=True)
+            elif kind == "group":
+                for sub_change in reversed(payload): self.revert(sub_change)
+            else:
+                self._ring = self._swap(evicted, payload)
+                if self._store_edits is not None: self._store_edits.append(("rewrite", None))
+
+    def _swap(self, source: _RingBuffer, target: _RingBuffer) -> _RingBuffer:
+        # Undoing or redoing a clear/load switches from `source` to `target`. Rows merged from other writers
+        # since then are carried over, so an undone clear does not delete them from the shared file.
+        if not self.multi_writer or self._ring is source: return target
+        extra = Counter(self._ring_rows(self._ring)) - Counter(self._ring_rows(source))
+        return self._rebuild([*self._ring_rows(target), *extra.elements()]) if extra else target
+
+    def shared_lock(self, file_path, encoding: str) -> SharedLock:
+        lock = self._shared_locks.get(str(file_path))
+        if lock is None: lock = self._shared_locks[str(file_path)] = SharedLock(self, file_path, encoding)
+        return lock
+
+    def refresh(self, file_path, encoding: str):
+        # Multi-writer mode: merges rows other processes appended, reading only the new tail of the file.
+        if not self.multi_writer: return
+        with self.shared_lock(file_path, encoding): self._sync(self._store(file_path, encoding))
+
+    def _sync(self, store: HistoryStore):
+        # Growth of the same file is read from the last offset and merged; a new inode, a shorter file or
+        # different bytes before the offset mean another process rewrote it, so it is reloaded. Inode numbers
+        # are reused once a replaced file is gone and mtimes are coarse, hence the anchor bytes check.
+        try: st = os.stat(store.file_path)
+        except FileNotFoundError: return
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        try:
+            same_file = (self._synced and st.st_ino == self._synced[0] and st.st_size >= self._shared_offset
+                         and store.read_anchor(self._shared_offset) == self._anchor)
+            if same_file and stamp == self._synced: return
+            if same_file:
+                rows, self._shared_offset = store.read_appended(self._shared_offset)
+                if rows:
+                    merged = [(a, b, self._op_code(name), result, ts) for a, b, name, result, ts in rows]
+                    self._ring = self._rebuild([*self._ring_rows(self._ring), *merged])
+            else:
+                # Writers stamp a calculation before taking the file lock, so the file can be slightly out of
+                # timestamp order; sorting keeps a reload consistent with the incremental merge above.
+                self._ring = self._rebuild(self._ring_rows(self._read_store(store)))
+                self._shared_offset = st.st_size
+            self._synced, self._anchor = stamp, store.read_anchor(self._shared_offset)
+        except Exception as e:
+            print(f"Error refreshing shared history: {e}")
+
+    def _mark_synced(self, store: HistoryStore):
+        # Called after this process wrote the file under the lock, so there is nothing of others' to merge.
+        st = os.stat(store.file_path)
+        self._synced, self._shared_offset = (st.st_ino, st.st_size, st.st_mtime_ns), st.st_size
+        self._anchor = store.read_anchor(st.st_size)
+
+    @property
+    def journal_events(self) -> int:
+        return self._journal_events
+
+    def record(self, event: str, file_path: str, encoding: str, calculation: Calculation = None):
+        # Undo/redo past what the journal can replay falls back to a full snapshot.
+        with self.lock:
+            store = self._store(file_path, encoding)
+            if self.multi_writer:
+                with self.shared_lock(file_path, encoding): self._record_shared(store, event, calculation)
+                return
+            if not store.journaled:
+                self._record_to_store(store, event, calculation)
+                return
+            if event in ("calculation", "batch", "clear"):
+                self._journal_undo, self._journal_redo = self._journal_undo + 1, 0
+            elif event == "undo" and self._journal_undo:
+                self._journal_undo, self._journal_redo = self._journal_undo - 1, self._journal_redo + 1
+            elif event == "redo" and self._journal_redo:
+                self._journal_undo, self._journal_redo = self._journal_undo + 1, self._journal_redo - 1
+            else:
+                self.save(file_path, encoding)
+                return
+            if event == "calculation": rows = [["add", *calculation.to_dict().values()]]
+            elif event == "batch":
+                batch_rows, timestamp = calculation.rows(), to_iso(calculation.timestamp)
+                rows = [["batch", len(batch_rows)], *(["add", *row, timestamp] for row in batch_rows)]
+            else: rows = [[event]]
+            try:
+                with open(journal_path(file_path), "a", newline="", encoding=encoding) as f:
+                    start = f.tell()
+                    csv.writer(f).writerows(rows)
+                    f.flush()
+                    if self._fsync_due(journal_path(file_path)): os.fsync(f.fileno())
+                    self.save_stats.bytes_written += f.tell() - start
+                self._journal_events += 1
+                self.save_stats.appends += 1
+            except IOError as e:
+                print(f"Error writing history journal: {e}")
+
+    @staticmethod
+    def _event_rows(event: str, calculation) -> list[tuple]:
+        if event == "calculation":
+            calc = calculation
+            return [(calc.operand_a, calc.operand_b, calc.operation_name, calc.result, calc.created)]
+        return [(*row, calculation.timestamp) for row in calculation.rows()]
+
+    def _record_to_store(self, store: HistoryStore, event: str, calculation):
+        # Undo/redo replay the logged row edits; clear, load and anything that swapped the whole ring rewrite it.
+        edits, self._store_edits = self._store_edits, []
+        try:
+            if event not in ("calculation", "batch", "undo", "redo") or any(kind == "rewrite" for kind, _ in edits):
+                self.export(store.file_path, store.encoding)
+                return
+            fsync = self._fsync_due(*store.sync_paths())
+            if edits: self.save_stats.bytes_written += store.apply_edits(edits, fsync)
+            if event in ("calculation", "batch"):
+                self.save_stats.bytes_written += store.append(self._event_rows(event, calculation), fsync)
+            self.save_stats.appends += 1
+        except Exception as e:
+            print(f"Error writing history store: {e}")
+
+    def _record_shared(self, store: HistoryStore, event: str, calculation):
+        # New rows are appended for the other processes to pick up; undo, redo and clear rewrite the merged
+        # history. Appends count as journal events, so the usual compaction keeps the file near max_history.
+        if event not in ("calculation", "batch"):
+            self.save(store.file_path, store.encoding)
+            return
         try:
-            df.to_csv(file_path, index=False, encoding=encoding)
-        except IOError as e:
-            print(f"Error saving history: {e}")
+            self.save_stats.bytes_written += store.append(self._event_rows(event, calculation),
+                                                         self._fsync_due(*store.sync_paths()))
+            self.save_stats.appends += 1
+            self._journal_events += 1
+            self._mark_synced(store)
+        except Exception as e:
+            print(f"Error writing shared history: {e}")
+
+    def _rows(self):
+        view = self.get_history()
+        return zip(view.values("operand_a"), view.values("operand_b"),
+                   [self._op_names[code] for code in view.values("operation_name")],
+                   view.values("result"), map(to_iso, view.values("timestamp")))
+
+    def _columns(self) -> dict:
+        view = self.get_history()
+        return {name: view.to_array(name) for name in FIELDS}
+
+    def _store(self, file_path, encoding: str) -> HistoryStore:
+        store = self._stores.get(str(file_path))
+        if store is None or store.encoding != encoding:
+            store = self._stores[str(file_path)] = open_store(file_path, encoding)
+            if not store.journaled and self._store_edits is None: self._store_edits = []
+        return store
+
+    def export(self, file_path: str, encoding: str):
+        # Writes a snapshot with the backend chosen by the file extension without touching the journal.
+        with self.lock:
+            store = self._store(file_path, encoding)
+            self.save_stats.bytes_written += store.write(self._op_names, self._columns(),
+                                                         self._fsync_due(*store.sync_paths()))
+            self.save_stats.snapshots += 1
+
+    def save(self, file_path: str, encoding: str):
+        with self.lock:
+            try:
+                # Evicted rows reach the archive before the snapshot that no longer holds them.
+                if self.archive is not None: self.archive.flush()
+                if self.multi_writer:
+                    with self.shared_lock(file_path, encoding):
+                        self.export(file_path, encoding)
+                        self._mark_synced(self._store(file_path, encoding))
+                else:
+                    self.export(file_path, encoding)
+                if os.path.exists(journal_path(file_path)):
+                    os.remove(journal_path(file_path))
+                self._journal_undo = self._journal_redo = self._journal_events = 0
+                if self._store_edits: self._store_edits.clear()
+            except Exception as e:
+                print(f"Error saving history: {e}")
+
+    def close(self):
+        with self.lock:
+            if self.archive is not None: self.archive.flush()
+            with self._fsync_lock: timer = self._fsync_timer
+            if timer: timer.cancel()
+            self._sync_deferred()
+            for store in self._stores.values(): store.close()
+            self._stores.clear()
+
+    def to_dataframe(self):
+        # Optional export path; pandas is only imported when this is called.
+        with self.lock:
+            import pandas as pd
+            return pd.DataFrame(list(self._rows()), columns=FIELDS)
 
     def load(self, file_path: str, encoding: str):
+        with self.lock:
+            previous, start = self._ring, time.perf_counter()
+            self.load_stats = LoadStats()
+            store = self._store(file_path, encoding)
+            if self.multi_writer:
+                self._synced = None
+                with self.shared_lock(file_path, encoding): self._sync(store)
+                self._changes.append(("set", previous, self._ring))
+                self.load_stats.seconds = time.perf_counter() - start
+                return
+            csv_path = os.path.splitext(str(file_path))[0] + ".csv"
+            try:
+                if store.exists() or str(file_path) == csv_path or not os.path.exists(csv_path):
+                    self._ring = self._read_store(store)
+                else:
+                    # One-time import of an existing CSV history. Incremental stores get the rows right away,
+                    # since later changes are appended to them; snapshot stores are written on the next save.
+                    self._ring = self._read_store(self._store(csv_path, encoding))
+                    if not store.journaled: store.write(self._op_names, self._columns())
+            except FileNotFoundError:
+                self._ring = self._to_ring(())
+            except Exception as e:
+                print(f"Error loading history: {e}")
+                self._ring = self._to_ring(())
+            if store.journaled: self._replay_journal(journal_path(file_path), encoding)
+            self._changes.append(("set", previous, self._ring))
+            self.load_stats.journal_events = self._journal_events
+            self.load_stats.seconds = time.perf_counter() - start
+
+    def _read_store(self, store: HistoryStore) -> _RingBuffer:
+        op_names, columns = store.read(self._max_history, self.load_stats)
+        codes = [self._op_code(name) for name in op_names]
+        ops = columns["operation_name"]
+        if codes != list(range(len(codes))): ops = array('H', (codes[code] for code in ops))
+        ring = _RingBuffer(self._max_history)
+        ring.fill(columns["operand_a"], columns["operand_b"], ops, columns["result"], columns["timestamp"])
+        return ring
+
+    def _replay_journal(self, path: str, encoding: str):
+        self._journal_undo = self._journal_redo = self._journal_events = 0
+        undo_stack, redo_stack = [], []
+        group, pending = None, 0
         try:
-            df = pd.read_csv(file_path, encoding=encoding)
-            df['operand_a'] = pd.to_numeric(df['operand_a'])
-            df['operand_b'] = pd.to_numeric(df['operand_b'])
-            df['result'] = pd.to_numeric(df['result'])
-            self._history = [Calculation.from_dict(row) for _, row in df.iterrows()]
+            with open(path, newline="", encoding=encoding) as f:
+                for row in csv.reader(f):
+                    if not row: continue
+                    event = row[0]
+                    if event == "add":
+                        calc_row = self._to_row(Calculation.from_dict(dict(zip(FIELDS, row[1:]))))
+                        change = ("add", calc_row, self._ring.push_back(calc_row))
+                        if pending:
+                            group.append(change)
+                            pending -= 1
+                            continue
+                        undo_stack.append(change)
+                        redo_stack.clear()
+                    elif event == "batch":
+                        group, pending = [], int(row[1])
+                        undo_stack.append(("group", group, None))
+                        redo_stack.clear()
+                    elif event == "clear":
+                        change = ("set", self._ring, self._to_ring(()))
+                        self.apply(change)
+                        undo_stack.append(change)
+                        redo_stack.clear()
+                    elif event == "undo" and undo_stack:
+                        change = undo_stack.pop()
+                        self.revert(change)
+                        redo_stack.append(change)
+                    elif event == "redo" and redo_stack:
+                        change = redo_stack.pop()
+                        self.apply(change)
+                        undo_stack.append(change)
+                    self._journal_events += 1
         except FileNotFoundError:
-            self._history = []
+            pass
         except Exception as e:
-            print(f"Error loading history: {e}")
-            self._history = []
\ No newline at end of file
+            print(f"Error replaying history journal: {e}")
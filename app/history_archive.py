@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import os
+from app.history_store import atomic_write, to_epoch, to_iso
+
+class HistoryArchive:
+    # Rows evicted from the live history, oldest first, in compressed segment files under `directory`.
+    # Evictions are buffered and each flush appends one compressed member to the open segment (gzip and xz
+    # both read concatenated members back as one stream); a segment is closed once it reaches max_bytes.
+    # index.json lists every segment with its row count and time range, so reads open only the segments
+    # they need. Rows are (operand_a, operand_b, operation_name, result, epoch timestamp). Flushed rows that
+    # an undo brings back are tombstoned by position in their segment's "removed" list and skipped on read.
+    FORMATS = {"gzip": ".csv.gz", "lzma": ".csv.xz"}
+
+    def __init__(self, directory: str, compression: str = "gzip", max_bytes: int = 1 << 20, flush_rows: int = 1000):
+        if compression not in self.FORMATS: raise ValueError(f"Unknown archive compression: '{compression}'")
+        if max_bytes <= 0 or flush_rows <= 0: raise ValueError("Archive segment size and flush size must be positive.")
+        self.directory, self.compression, self.max_bytes, self.flush_rows = directory, compression, max_bytes, flush_rows
+        self.index_path = os.path.join(directory, "index.json")
+        self._pending: list[tuple] = []
+        self._dirty = False
+        self._cache = (None, None)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f: self.segments: list[dict] = json.load(f)
+        except FileNotFoundError:
+            self.segments = []
+
+    def __len__(self):
+        return sum(map(self._live, self.segments)) + len(self._pending)
+
+    @staticmethod
+    def _live(segment: dict) -> int:
+        return segment["rows"] - len(segment.get("removed", ()))
+
+    def evict(self, row: tuple):
+        self._pending.append(row)
+        if len(self._pending) >= self.flush_rows: self.flush()
+
+    def restore(self, row: tuple):
+        # Undo returns rows in the reverse order they were evicted, so `row` is the newest archived one: the last
+        # buffered row, or else the newest live row on disk, which is tombstoned until the next flush saves the index.
+        if self._pending:
+            self._pending.pop()
+            return
+        for segment in reversed(self.segments):
+            if not self._live(segment): continue
+            removed = segment.setdefault("removed", [])
+            position, taken = segment["rows"] - 1, set(removed)
+            while position in taken: position -= 1
+            removed.append(position)
+            self._dirty = True
+            if segment["file"] == self._cache[0]: self._cache = (None, None)
+            return
+
+    def _codec(self):
+        if self.compression == "gzip":
+            import gzip
+            return gzip
+        import lzma
+        return lzma
+
+    def flush(self):
+        if not self._pending:
+            if self._dirty: self._write_index()
+            return
+        rows, self._pending = self._pending, []
+        text = io.StringIO()
+        csv.writer(text).writerows((a, b, name, result, to_iso(ts)) for a, b, name, result, ts in rows)
+        data = self._codec().compress(text.getvalue().encode("utf-8"))
+        if not self.segments or self.segments[-1]["bytes"] >= self.max_bytes:
+            name = f"segment-{len(self.segments) + 1:06d}{self.FORMATS[self.compression]}"
+            self.segments.append({"file": name, "rows": 0, "bytes": 0, "first": rows[0][4], "last": rows[0][4]})
+        segment = self.segments[-1]
+        with open(os.path.join(self.directory, segment["file"]), "ab") as f: f.write(data)
+        segment["rows"] += len(rows)
+        segment["bytes"] += len(data)
+        segment["first"] = min(segment["first"], min(row[4] for row in rows))
+        segment["last"] = max(segment["last"], max(row[4] for row in rows))
+        self._write_index()
+        if segment["file"] == self._cache[0]: self._cache = (None, None)
+
+    def _write_index(self):
+        atomic_write(self.index_path, lambda f: json.dump(self.segments, f), encoding="utf-8")
+        self._dirty = False
+
+    def _read_segment(self, segment: dict) -> list[tuple]:
+        # The most recently read segment is kept, so paging through it decompresses it once.
+        if self._cache[0] != segment["file"]:
+            path = os.path.join(self.directory, segment["file"])
+            removed = set(segment.get("removed", ()))
+            with self._codec().open(path, "rt", encoding="utf-8", newline="") as f:
+                rows = [(float(a), float(b), name, float(result), to_epoch(ts))
+                        for i, (a, b, name, result, ts) in enumerate(csv.reader(f)) if i not in removed]
+            self._cache = (segment["file"], rows)
+        return self._cache[1]
+
+    def rows(self, start: int, stop: int) -> list[tuple]:
+        # Rows [start, stop) in archive order; only the segments overlapping the range are decompressed.
+        result, offset = [], 0
+        for segment in self.segments:
+            end = offset + self._live(segment)
+            if end > start and offset < stop:
+                result.extend(self._read_segment(segment)[max(start - offset, 0):stop - offset])
+            offset = end
+        return result + self._pending[max(start - offset, 0):max(stop - offset, 0)]
+
+    def scan(self, since: float = None, until: float = None):
+        # Yields every row, skipping segments whose time range lies outside [since, until].
+        for segment in self.segments:
+            if since is not None and segment["last"] < since: continue
+            if until is not None and segment["first"] > until: continue
+            yield from self._read_segment(segment)
+        yield from self._pending
+
+    def stats(self) -> dict:
+        return {"segments": len(self.segments), "rows": len(self), "pending": len(self._pending),
+                "bytes": sum(segment["bytes"] for segment in self.segments)}
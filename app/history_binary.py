@@ -0,0 +1,54 @@
+import mmap
+import struct
+import sys
+from array import array
+
+# Layout (little-endian): header, operation-name table, zero padding to 8 bytes, then the
+# operand_a, operand_b, result and timestamp float64 columns followed by the uint16 op-code column.
+MAGIC = b"CALCHIST"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQ")
+NAME_LENGTH = struct.Struct("<H")
+FLOAT_COLUMNS = ("operand_a", "operand_b", "result", "timestamp")
+
+def _le(column: array) -> array:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+def encode_binary(op_names: list[str], columns: dict) -> bytes:
+    count = len(columns["operand_a"])
+    parts = [HEADER.pack(MAGIC, VERSION, 0, len(op_names), count)]
+    for name in op_names:
+        encoded = name.encode("utf-8")
+        parts += [NAME_LENGTH.pack(len(encoded)), encoded]
+    parts.append(bytes(-sum(map(len, parts)) % 8))
+    parts += [_le(columns[name]).tobytes() for name in FLOAT_COLUMNS]
+    parts.append(_le(columns["operation_name"]).tobytes())
+    return b"".join(parts)
+
+def read_binary(file_path, limit: int):
+    # Memory-maps the file and copies out only the newest `limit` rows of each column.
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, _, n_names, count = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC: raise ValueError("Not a calculator history file.")
+        if version != VERSION: raise ValueError(f"Unsupported history file version: {version}.")
+        offset, op_names = HEADER.size, []
+        for _ in range(n_names):
+            (length,) = NAME_LENGTH.unpack_from(mm, offset)
+            op_names.append(bytes(mm[offset + NAME_LENGTH.size:offset + NAME_LENGTH.size + length]).decode("utf-8"))
+            offset += NAME_LENGTH.size + length
+        offset += -offset % 8
+        keep = min(max(limit, 0), count)
+        columns, view = {}, memoryview(mm)
+        try:
+            for name, typecode in (*((name, "d") for name in FLOAT_COLUMNS), ("operation_name", "H")):
+                width = array(typecode).itemsize
+                start = offset + (count - keep) * width
+                columns[name] = array(typecode)
+                columns[name].frombytes(view[start:start + keep * width])
+                offset += count * width
+        finally:
+            view.release()
+    return op_names, {name: _le(column) for name, column in columns.items()}
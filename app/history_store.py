@@ -0,0 +1,278 @@
+import csv
+import os
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from app.history_binary import encode_binary, read_binary
+
+FIELDS = ["operand_a", "operand_b", "operation_name", "result", "timestamp"]
+TAIL_BLOCK_SIZE = 1 << 16
+
+def to_epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp).timestamp()
+
+def to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).isoformat()
+
+def read_tail_lines(f, count: int, start: int) -> list[bytes]:
+    # Reads whole lines backwards from the end of a binary file until `count` complete lines past `start` are found.
+    f.seek(0, os.SEEK_END)
+    pos, blocks, newlines = f.tell(), [], 0
+    while pos > start and newlines <= count:
+        step = min(TAIL_BLOCK_SIZE, pos - start)
+        pos -= step
+        f.seek(pos)
+        blocks.append(f.read(step))
+        newlines += blocks[-1].count(b"\n")
+    # The first piece is only a fragment if reading stopped mid-file; it is dropped before blank lines are,
+    # so a block boundary right after a newline does not cost a real line.
+    lines = b"".join(reversed(blocks)).splitlines()
+    if pos > start: lines = lines[1:]
+    lines = [line for line in lines if line.strip()]
+    return lines[max(len(lines) - count, 0):] if count else []
+
+def fsync_path(path: str):
+    # Syncs whatever file or directory is at `path` now; missing paths, and directories on platforms that
+    # cannot open them, are skipped.
+    try: fd = os.open(path, os.O_RDONLY)
+    except OSError: return
+    try: os.fsync(fd)
+    finally: os.close(fd)
+
+def fsync_directory(directory: str):
+    # Makes a rename durable.
+    fsync_path(directory)
+
+def atomic_write(file_path, write, binary: bool = False, fsync: bool = False, encoding: str = None) -> int:
+    # Writes through a temporary file in the same directory and renames it over file_path, so a crash
+    # leaves either the old or the new file, never a truncated one. Returns the bytes written.
+    file_path = str(file_path)
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb" if binary else "w", **({} if binary else {"newline": "", "encoding": encoding})) as f:
+            write(f)
+            f.flush()
+            if fsync: os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path): os.remove(temp_path)
+        raise
+    if fsync: fsync_directory(os.path.dirname(os.path.abspath(file_path)))
+    return size
+
+@contextmanager
+def file_lock(lock_path: str, exclusive: bool = True):
+    # Advisory lock on a sidecar file: the history file itself is replaced on rewrite, so its inode cannot
+    # carry the lock. fcntl is POSIX-only and imported on first use.
+    try: import fcntl
+    except ImportError: raise ValueError("Multi-writer history requires fcntl file locks (POSIX only).")
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try: yield
+        finally: fcntl.flock(f, fcntl.LOCK_UN)
+
+def _encode_names(names) -> tuple[list[str], array]:
+    codes: dict[str, int] = {}
+    ops = array('H', (codes.setdefault(name, len(codes)) for name in names))
+    return list(codes), ops
+
+
+class HistoryStore:
+    # One persisted history file. Columns are arrays keyed by FIELDS, with operation_name as codes into op_names
+    # and timestamp as epoch seconds. Snapshot stores are rewritten on save and rely on the HistoryManager
+    # journal in between; incremental stores (journaled = False) take each change through append/write.
+    journaled = True
+
+    def __init__(self, file_path, encoding: str):
+        self.file_path, self.encoding = str(file_path), encoding
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def read(self, limit: int, stats) -> tuple[list[str], dict]:
+        raise NotImplementedError("Subclasses must implement the 'read' method.")
+
+    def write(self, op_names: list[str], columns: dict, fsync: bool = False) -> int:
+        # Replaces the stored history; returns the bytes written.
+        raise NotImplementedError("Subclasses must implement the 'write' method.")
+
+    def append(self, rows: list[tuple], fsync: bool = False) -> int:
+        # rows are (operand_a, operand_b, operation_name, result, epoch timestamp).
+        raise NotImplementedError(f"{type(self).__name__} only supports full snapshots.")
+
+    def apply_edits(self, edits: list[tuple], fsync: bool = False) -> int:
+        # edits are ("insert", row) or ("delete", row) in order; a delete removes the newest matching row.
+        raise NotImplementedError(f"{type(self).__name__} only supports full snapshots.")
+
+    def sync_paths(self) -> list[str]:
+        # Files a deferred fsync has to sync to make this store's writes durable.
+        return [self.file_path]
+
+    def close(self): pass
+
+
+class CsvStore(HistoryStore):
+    def read(self, limit: int, stats) -> tuple[list[str], dict]:
+        # Only the last `limit` data lines are read, then parsed column by column.
+        with open(self.file_path, "rb") as f:
+            header_line = f.readline()
+            header = next(csv.reader([header_line.decode(self.encoding)]), FIELDS)
+            lines = read_tail_lines(f, limit, len(header_line))
+            stats.file_size = os.fstat(f.fileno()).st_size
+        stats.bytes_read = len(header_line) + sum(len(line) + 1 for line in lines)
+        rows = list(csv.reader(line.decode(self.encoding) for line in lines))
+        columns = list(zip(*rows)) if rows else [()] * len(header)
+        op_names, ops = _encode_names(columns[header.index("operation_name")])
+        stats.rows = len(rows)
+        return op_names, {
+            "operand_a": array('d', map(float, columns[header.index("operand_a")])),
+            "operand_b": array('d', map(float, columns[header.index("operand_b")])),
+            "operation_name": ops,
+            "result": array('d', map(float, columns[header.index("result")])),
+            "timestamp": array('d', map(to_epoch, columns[header.index("timestamp")]) if "timestamp" in header
+                               else [time.time()] * len(rows)),
+        }
+
+    def write(self, op_names: list[str], columns: dict, fsync: bool = False) -> int:
+        def write_rows(f):
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows(zip(columns["operand_a"], columns["operand_b"],
+                                 [op_names[code] for code in columns["operation_name"]],
+                                 columns["result"], map(to_iso, columns["timestamp"])))
+        return atomic_write(self.file_path, write_rows, fsync=fsync, encoding=self.encoding)
+
+    def append(self, rows: list[tuple], fsync: bool = False) -> int:
+        with open(self.file_path, "a", newline="", encoding=self.encoding) as f:
+            start = f.tell()
+            writer = csv.writer(f)
+            if start == 0: writer.writerow(FIELDS)
+            writer.writerows((a, b, name, result, to_iso(ts)) for a, b, name, result, ts in rows)
+            f.flush()
+            if fsync: os.fsync(f.fileno())
+            return f.tell() - start
+
+    def read_anchor(self, offset: int, size: int = 128) -> bytes:
+        # The bytes just before `offset`; if they changed, the file was rewritten rather than appended to.
+        with open(self.file_path, "rb") as f:
+            f.seek(max(offset - size, 0))
+            return f.read(min(offset, size))
+
+    def read_appended(self, offset: int) -> tuple[list[tuple], int]:
+        # Rows written after byte `offset`, as (operand_a, operand_b, operation_name, result, epoch timestamp),
+        # and the offset to continue from. A trailing partial line is left for the next call; lines that do
+        # not parse (a writer that died mid-line) are skipped.
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].splitlines()
+        if offset == 0: lines = lines[1:]
+        rows = []
+        for row in csv.reader(line.decode(self.encoding) for line in lines if line.strip()):
+            try: rows.append((float(row[0]), float(row[1]), row[2], float(row[3]), to_epoch(row[4])))
+            except (ValueError, IndexError): continue
+        return rows, offset + end
+
+
+class BinaryStore(HistoryStore):
+    def read(self, limit: int, stats) -> tuple[list[str], dict]:
+        op_names, columns = read_binary(self.file_path, limit)
+        stats.rows = len(columns["operand_a"])
+        stats.file_size = os.path.getsize(self.file_path)
+        stats.bytes_read = stats.rows * (4 * columns["operand_a"].itemsize + columns["operation_name"].itemsize)
+        return op_names, columns
+
+    def write(self, op_names: list[str], columns: dict, fsync: bool = False) -> int:
+        data = encode_binary(op_names, columns)
+        return atomic_write(self.file_path, lambda f: f.write(data), binary=True, fsync=fsync)
+
+
+class SQLiteStore(HistoryStore):
+    # Calculations are appended as they happen in WAL mode, one transaction per batch, and undo/redo delete or
+    # re-insert the rows they affect, so the table keeps rows older than max_history. Only clear and load
+    # rewrite it. Startup reads the newest rows through the primary key.
+    journaled = False
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS calculations (id INTEGER PRIMARY KEY, operand_a REAL NOT NULL, "
+        "operand_b REAL NOT NULL, operation_name TEXT NOT NULL, result REAL NOT NULL, timestamp REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS calculations_timestamp ON calculations (timestamp)",
+        "CREATE INDEX IF NOT EXISTS calculations_operation_name ON calculations (operation_name)",
+    )
+    # Payload size per row, used for the bytes-written stats (SQLite does not report page writes).
+    ROW_BYTES = 4 * 8 + 8
+    INSERT = ("INSERT INTO calculations (operand_a, operand_b, operation_name, result, timestamp) "
+              "VALUES (?, ?, ?, ?, ?)")
+    DELETE_NEWEST = ("DELETE FROM calculations WHERE id = (SELECT MAX(id) FROM calculations WHERE operand_a = ? "
+                     "AND operand_b = ? AND operation_name = ? AND result = ? AND timestamp = ?)")
+
+    def __init__(self, file_path, encoding: str):
+        super().__init__(file_path, encoding)
+        self._connection = None
+
+    @property
+    def connection(self):
+        # sqlite3 is imported on first use; callers serialize access through the HistoryManager lock.
+        if self._connection is None:
+            import sqlite3
+            self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            with self._connection:
+                for statement in self.SCHEMA: self._connection.execute(statement)
+        return self._connection
+
+    def read(self, limit: int, stats) -> tuple[list[str], dict]:
+        if not self.exists(): raise FileNotFoundError(self.file_path)
+        rows = self.connection.execute(
+            "SELECT operand_a, operand_b, operation_name, result, timestamp FROM calculations "
+            "ORDER BY id DESC LIMIT ?", (max(limit, 0),)).fetchall()
+        rows.reverse()
+        a, b, names, results, timestamps = zip(*rows) if rows else ((),) * 5
+        op_names, ops = _encode_names(names)
+        stats.rows = len(rows)
+        stats.file_size = os.path.getsize(self.file_path)
+        stats.bytes_read = stats.rows * self.ROW_BYTES
+        return op_names, {"operand_a": array('d', a), "operand_b": array('d', b), "operation_name": ops,
+                          "result": array('d', results), "timestamp": array('d', timestamps)}
+
+    def _transaction(self, fsync: bool):
+        # A synced commit flushes the WAL to disk (synchronous=FULL); otherwise only checkpoints do.
+        connection = self.connection
+        connection.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        return connection
+
+    def write(self, op_names: list[str], columns: dict, fsync: bool = False) -> int:
+        rows = list(zip(columns["operand_a"], columns["operand_b"],
+                        [op_names[code] for code in columns["operation_name"]], columns["result"], columns["timestamp"]))
+        with self._transaction(fsync) as connection:
+            connection.execute("DELETE FROM calculations")
+            connection.executemany(self.INSERT, rows)
+        return len(rows) * self.ROW_BYTES
+
+    def append(self, rows: list[tuple], fsync: bool = False) -> int:
+        with self._transaction(fsync) as connection:
+            connection.executemany(self.INSERT, rows)
+        return len(rows) * self.ROW_BYTES
+
+    def apply_edits(self, edits: list[tuple], fsync: bool = False) -> int:
+        with self._transaction(fsync) as connection:
+            for kind, row in edits: connection.execute(self.INSERT if kind == "insert" else self.DELETE_NEWEST, row)
+        return len(edits) * self.ROW_BYTES
+
+    def sync_paths(self) -> list[str]:
+        return [self.file_path, self.file_path + "-wal"]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+STORES = {".csv": CsvStore, ".bin": BinaryStore, ".db": SQLiteStore, ".sqlite": SQLiteStore}
+
+def open_store(file_path, encoding: str) -> HistoryStore:
+    # The backend is chosen by file extension; anything unrecognised is treated as CSV.
+    return STORES.get(os.path.splitext(str(file_path))[1].lower(), CsvStore)(file_path, encoding)
@@ -1,16 +1,116 @@
+from datetime import datetime
+from itertools import chain
 from app.exceptions import ValidationError
 
+# Error codes of validate_operands_bulk; code k > 0 maps to operand_error_messages(max_value)[k - 1].
+OPERAND_COUNT_ERROR, OPERAND_NUMBER_ERROR, OPERAND_RANGE_ERROR = 1, 2, 3
+
+def operand_error_messages(max_value: float) -> list[str]:
+    return ["Exactly two numerical inputs are required.", "Inputs must be valid numbers.",
+            f"Inputs must be between -{max_value} and {max_value}."]
+
 def validate_operands(inputs: list[str], max_value: float):
     if len(inputs) != 2:
-        raise ValidationError("Exactly two numerical inputs are required.")
+        raise ValidationError(operand_error_messages(max_value)[OPERAND_COUNT_ERROR - 1])
     
     try:
         a = float(inputs[0])
         b = float(inputs[1])
     except ValueError:
-        raise ValidationError("Inputs must be valid numbers.") from None
+        raise ValidationError(operand_error_messages(max_value)[OPERAND_NUMBER_ERROR - 1]) from None
     
     if abs(a) > max_value or abs(b) > max_value:
-        raise ValidationError(f"Inputs must be between -{max_value} and {max_value}.")
+        raise ValidationError(operand_error_messages(max_value)[OPERAND_RANGE_ERROR - 1])
     
     return a, b
+
+def _to_float(token) -> float:
+    try: return float(token)
+    except ValueError: return None
+
+def validate_operands_bulk(rows: list, max_value: float):
+    # Validates many operand lists at once, with the same rules and precedence as validate_operands.
+    # Returns float64 arrays a and b plus int8 error codes; a and b are NaN where the code is not 0.
+    # Tokens may be str or bytes. NumPy is imported on first use, like the rest of the batch path.
+    import numpy as np
+    n = len(rows)
+    pairs = np.fromiter(map(len, rows), np.intp, n) == 2
+    flat = chain.from_iterable(rows) if pairs.all() else [token for row in rows if len(row) == 2 for token in row]
+    count = 2 * int(np.count_nonzero(pairs))
+    codes = np.where(pairs, 0, OPERAND_COUNT_ERROR).astype(np.int8)
+    try:
+        values = np.fromiter(map(float, flat), np.float64, count)
+        bad = np.zeros(count // 2, dtype=bool)
+    except ValueError:
+        # Slow path, only for chunks with an unparsable token.
+        parsed = [_to_float(token) for row in rows if len(row) == 2 for token in row]
+        values = np.array([np.nan if value is None else value for value in parsed], dtype=np.float64)
+        bad = np.array([value is None for value in parsed], dtype=bool).reshape(-1, 2).any(axis=1)
+    values = values.reshape(-1, 2)
+    out_of_range = (np.abs(values) > max_value).any(axis=1) & ~bad
+    pair_codes = np.where(bad, OPERAND_NUMBER_ERROR, np.where(out_of_range, OPERAND_RANGE_ERROR, 0))
+    codes[pairs] = pair_codes
+    a, b = np.full(n, np.nan), np.full(n, np.nan)
+    ok = pairs.copy()
+    ok[pairs] = pair_codes == 0
+    a[ok], b[ok] = values[pair_codes == 0].T
+    return a, b, codes
+
+def parse_operand_buffer(data: bytes, max_value: float):
+    # Bulk front end for raw "op a b" lines: returns the lowercased operation names and the
+    # validate_operands_bulk arrays, skipping blank lines. Numbers are parsed from bytes without decoding.
+    lines = [parts for parts in map(bytes.split, data.splitlines()) if parts]
+    ops = [parts[0].decode().lower() for parts in lines]
+    return (ops, *validate_operands_bulk([parts[1:] for parts in lines], max_value))
+
+HISTORY_OPTIONS = {"--op": "op_name", "--result": "result", "--since": "since", "--until": "until",
+                   "--limit": "limit", "--page": "page"}
+
+def _query_number(text: str) -> float:
+    try: return float(text)
+    except ValueError: raise ValidationError(f"Invalid number in history query: '{text}'.") from None
+
+def _query_time(text: str) -> float:
+    # Accepts epoch seconds or an ISO timestamp.
+    try: return float(text)
+    except ValueError: pass
+    try: return datetime.fromisoformat(text).timestamp()
+    except ValueError: raise ValidationError(f"Invalid timestamp in history query: '{text}'.") from None
+
+def _query_count(text: str, name: str) -> int:
+    if not text.isdigit() or int(text) < 1: raise ValidationError(f"{name} must be a positive integer.")
+    return int(text)
+
+def parse_result_range(text: str) -> tuple:
+    # '>100', '>=100', '<5', '<=5', '=3' or '3', and '10..20' (inclusive; either end may be omitted).
+    if ".." in text:
+        low, high = text.split("..", 1)
+        return (_query_number(low) if low else None, True, _query_number(high) if high else None, True)
+    for prefix, bounds in ((">=", lambda v: (v, True, None, False)), ("<=", lambda v: (None, False, v, True)),
+                           (">", lambda v: (v, False, None, False)), ("<", lambda v: (None, False, v, False)),
+                           ("=", lambda v: (v, True, v, True))):
+        if text.startswith(prefix): return bounds(_query_number(text[len(prefix):]))
+    value = _query_number(text)
+    return (value, True, value, True)
+
+def parse_history_query(inputs: list[str]) -> dict:
+    # history [--op NAME] [--result RANGE] [--since TS] [--until TS] [--limit N] [--page N] [--archive]
+    inputs = [value.strip("'\"") for value in inputs]
+    # Flags are case-insensitive; values such as ISO timestamps keep their case.
+    inputs = [value.lower() if value.startswith("--") else value for value in inputs]
+    archive = "--archive" in inputs
+    inputs = [value for value in inputs if value != "--archive"]
+    if len(inputs) % 2: raise ValidationError(f"Missing value for history option '{inputs[-1]}'.")
+    query = {}
+    for flag, value in zip(inputs[::2], inputs[1::2]):
+        if flag not in HISTORY_OPTIONS: raise ValidationError(f"Unknown history option: '{flag}'.")
+        query[HISTORY_OPTIONS[flag]] = value
+    if "result" in query: query["result"] = parse_result_range(query["result"])
+    for key in ("since", "until"):
+        if key in query: query[key] = _query_time(query[key])
+    if "limit" in query: query["limit"] = _query_count(query["limit"], "Limit")
+    if "page" in query: query["page"] = _query_count(query["page"], "Page")
+    # The archive can be far larger than the live history, so it is always paged.
+    if "page" in query or archive: query.setdefault("limit", 20)
+    if archive: query["archive"] = True
+    return query
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from functools import wraps
+from app.history import journal_path
+
+def _bucket(ns: int) -> int:
+    # Log-linear bucket keeping the top 4 significant bits: 8 buckets per power of two (<= 12.5% error).
+    shift = max(ns.bit_length() - 4, 0)
+    return (shift << 4) | (ns >> shift)
+
+def _bucket_upper(key: int) -> int:
+    shift, mantissa = key >> 4, key & 15
+    return ((mantissa + 1) << shift) - 1
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets: dict[int, int] = {}
+
+    def record(self, ns: int):
+        self.count += 1
+        self.total += ns
+        if ns > self.max: self.max = ns
+        key = _bucket(ns)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def percentile(self, q: float) -> int:
+        # Upper edge of the bucket holding the q-th quantile, in nanoseconds.
+        rank, seen = q * self.count, 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank: return min(_bucket_upper(key), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        mean = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "mean_us": mean / 1000, "p50_us": self.percentile(0.50) / 1000,
+                "p95_us": self.percentile(0.95) / 1000, "p99_us": self.percentile(0.99) / 1000,
+                "max_us": self.max / 1000}
+
+
+class Instrumentation:
+    # Opt-in: install() swaps instance attributes for timing wrappers, so a disabled app runs the original
+    # bound methods with no extra checks.
+    def __init__(self):
+        self.histograms: dict[str, Histogram] = {}
+        self.bytes_written: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ns: int):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None: histogram = self.histograms[name] = Histogram()
+            histogram.record(ns)
+
+    def add_bytes(self, name: str, count: int):
+        with self._lock: self.bytes_written[name] = self.bytes_written.get(name, 0) + count
+
+    def timed(self, name: str, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try: return func(*args, **kwargs)
+            finally: self.record(name, time.perf_counter_ns() - start)
+        return wrapper
+
+    def _timed_write(self, name: str, func):
+        # Snapshots overwrite their target, so the bytes written are its size afterwards.
+        timed = self.timed(name, func)
+        @wraps(func)
+        def wrapper(file_path, *args, **kwargs):
+            try: return timed(file_path, *args, **kwargs)
+            finally: self.add_bytes(name, _size(file_path))
+        return wrapper
+
+    def _timed_journal(self, func):
+        timed = self.timed("history.record", func)
+        @wraps(func)
+        def wrapper(event, file_path, *args, **kwargs):
+            path = journal_path(file_path)
+            before = _size(path)
+            try: return timed(event, file_path, *args, **kwargs)
+            finally: self.add_bytes("history.record", max(_size(path) - before, 0))
+        return wrapper
+
+    def _timed_compute(self, func):
+        @wraps(func)
+        def wrapper(op_name, a, b):
+            start = time.perf_counter_ns()
+            try: return func(op_name, a, b)
+            finally: self.record(f"operation.{op_name}", time.perf_counter_ns() - start)
+        return wrapper
+
+    def install(self, app):
+        app.execute_calculation = self.timed("execute_calculation", app.execute_calculation)
+        app._compute = self._timed_compute(app._compute)
+        for observer in [*app.observers, *app.inline_observers]:
+            observer.update = self.timed(f"observer.{type(observer).__name__}", observer.update)
+        history = app.history
+        history.save = self._timed_write("history.save", history.save)
+        history.export = self._timed_write("history.export", history.export)
+        history.load = self.timed("history.load", history.load)
+        history.record = self._timed_journal(history.record)
+        app.caretaker.save = self.timed("caretaker.save", app.caretaker.save)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.bytes_written.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"latency": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                    "bytes_written": dict(sorted(self.bytes_written.items()))}
+
+    def report(self) -> str:
+        data = self.to_dict()
+        lines = [f"{'name':<28} {'count':>8} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'max us':>10}"]
+        for name, h in data["latency"].items():
+            lines.append(f"{name:<28} {h['count']:>8} {h['p50_us']:>10.1f} {h['p95_us']:>10.1f} "
+                         f"{h['p99_us']:>10.1f} {h['max_us']:>10.1f}")
+        for name, count in data["bytes_written"].items():
+            lines.append(f"{name + ' bytes':<28} {count:>8}")
+        return "\n".join(lines)
+
+def _size(path) -> int:
+    try: return os.path.getsize(path)
+    except OSError: return 0
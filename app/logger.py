@@ -1,22 +1,83 @@
+import atexit
+import json
 import logging
 import os
+import queue
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 
-def setup_logger(log_dir: str, log_level=logging.INFO) -> Logger:
+_listeners: dict[str, QueueListener] = {}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": self.formatTime(record), "name": record.name, "level": record.levelname,
+                 "message": record.getMessage()}
+        if record.exc_info: entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+class SamplingFilter(logging.Filter):
+    # Keeps `rate` of the records logged with extra={"sampled": True}; all other records pass.
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._credit = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.rate >= 1: return True
+        self._credit += self.rate
+        if self._credit < 1: return False
+        self._credit -= 1
+        return True
+
+class DeferredQueueHandler(QueueHandler):
+    # The stock QueueHandler formats in the caller's thread; leave that to the listener instead.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def stop_logger(logger: Logger):
+    listener = _listeners.pop(logger.name, None)
+    if listener:
+        listener.stop()
+        for handler in listener.handlers: handler.close()
+
+def _stop_all():
+    for name in list(_listeners): stop_logger(logging.getLogger(name))
+
+def setup_logger(log_dir: str, log_level=logging.INFO, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5,
+                 rotate_when: str = "", log_format: str = "text", sample_rate: float = 1.0) -> Logger:
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, "calculator.log")
 
     logger = logging.getLogger("CalculatorApp")
+    stop_logger(logger)
     if logger.hasHandlers():
+        for handler in logger.handlers: handler.close()
         logger.handlers.clear()
+    logger.filters.clear()
 
     logger.setLevel(log_level)
+    # Records must not also reach root handlers, which would format them on the calling thread.
+    logger.propagate = False
 
-    file_handler = logging.FileHandler(log_file)
+    if rotate_when:
+        file_handler = TimedRotatingFileHandler(log_file, when=rotate_when, backupCount=backup_count)
+    else:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
     file_handler.setLevel(log_level)
 
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    return logger
\ No newline at end of file
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    _listeners[logger.name] = listener
+
+    logger.addFilter(SamplingFilter(sample_rate))
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    return logger
+
+atexit.register(_stop_all)
@@ -1,63 +1,179 @@
+import logging
 import math
+from app.exceptions import OperationError
 
 class Operation:
+    # Messages for the per-element error codes of execute_batch (code k -> error_messages[k - 1]).
+    error_messages: tuple = ()
 
     def execute(self, a: float, b: float) -> float:
         raise NotImplementedError("Subclasses must implement the 'execute' method.")
 
+    def kernel(self, np, a, b):
+        raise NotImplementedError("Subclasses must implement the 'kernel' method.")
+
+    def check(self, np, a, b):
+        return np.zeros(a.shape, dtype=np.int8)
+
+    def execute_batch(self, a, b):
+        import numpy as np
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        codes = self.check(np, a, b)
+        with np.errstate(all="ignore"):
+            result = np.asarray(self.kernel(np, a, b), dtype=np.float64)
+        return np.where(codes == 0, result, np.nan), codes
+
 class Addition(Operation):
     def execute(self, a: float, b: float) -> float: return a + b
+    def kernel(self, np, a, b): return a + b
 
 class Subtraction(Operation):
     def execute(self, a: float, b: float) -> float: return a - b
+    def kernel(self, np, a, b): return a - b
 
 class Multiplication(Operation):
     def execute(self, a: float, b: float) -> float: return a * b
+    def kernel(self, np, a, b): return a * b
 
 class Division(Operation):
+    error_messages = ("Division by zero.",)
     def execute(self, a: float, b: float) -> float:
-        if b == 0: raise ValueError("Division by zero.")
+        if b == 0: raise OperationError(self.error_messages[0])
         return a / b
-    
+    def check(self, np, a, b): return (b == 0).astype(np.int8)
+    def kernel(self, np, a, b): return a / b
+
 class Power(Operation):
-    def execute(self, a: float, b: float) -> float: return math.pow(a, b)
+    error_messages = ("Power result is undefined or out of range.",)
+    def execute(self, a: float, b: float) -> float:
+        try: return math.pow(a, b)
+        except (ValueError, OverflowError): raise OperationError(self.error_messages[0]) from None
+    def kernel(self, np, a, b): return np.power(a, b)
+    def check(self, np, a, b):
+        with np.errstate(all="ignore"):
+            undefined = ((a < 0) & (b != np.floor(b))) | ((a == 0) & (b < 0)) | ~np.isfinite(np.power(a, b))
+        return (undefined & np.isfinite(a) & np.isfinite(b)).astype(np.int8)
 
 class Root(Operation):
+    error_messages = ("Even root of a negative number.", "Zero root is undefined.")
     def execute(self, a: float, b: float) -> float:
-        if a < 0 and b % 2 == 0: raise ValueError("Even root of a negative number.")
+        if a < 0 and b % 2 == 0: raise OperationError(self.error_messages[0])
+        if b == 0: raise OperationError(self.error_messages[1])
         return -math.pow(abs(a), 1/b) if a < 0 else math.pow(a, 1/b)
-    
+    def check(self, np, a, b):
+        return np.where((a < 0) & (np.mod(b, 2) == 0), 1, np.where(b == 0, 2, 0)).astype(np.int8)
+    def kernel(self, np, a, b):
+        magnitude = np.power(np.abs(a), 1 / b)
+        return np.where(a < 0, -magnitude, magnitude)
+
 class Modulus(Operation):
+    error_messages = ("Modulus by zero.",)
     def execute(self, a: float, b: float) -> float:
-        if b == 0: raise ValueError("Modulus by zero.")
+        if b == 0: raise OperationError(self.error_messages[0])
         return a % b
-    
+    def check(self, np, a, b): return (b == 0).astype(np.int8)
+    def kernel(self, np, a, b): return np.mod(a, b)
+
 class IntegerDivision(Operation):
+    error_messages = ("Integer division by zero.",)
     def execute(self, a: float, b: float) -> float:
-        if b == 0: raise ValueError("Integer division by zero.")
+        if b == 0: raise OperationError(self.error_messages[0])
         return float(a // b)
-    
+    def check(self, np, a, b): return (b == 0).astype(np.int8)
+    def kernel(self, np, a, b): return np.floor_divide(a, b)
+
 class Percentage(Operation):
+    error_messages = ("Cannot calculate percentage with respect to zero.",)
     def execute(self, a: float, b: float) -> float:
-        if b == 0: raise ValueError("Cannot calculate percentage with respect to zero.")
+        if b == 0: raise OperationError(self.error_messages[0])
         return (a / b) * 100
-    
+    def check(self, np, a, b): return (b == 0).astype(np.int8)
+    def kernel(self, np, a, b): return (a / b) * 100
+
 class AbsoluteDifference(Operation):
     def execute(self, a: float, b: float) -> float: return abs(a - b)
+    def kernel(self, np, a, b): return np.abs(a - b)
 
 class OperationFactory:
+    # Operations are stateless, so each one is a single shared instance. `_dispatch` maps every name and alias
+    # to that instance and `_names` maps them to the operation name recorded in history.
+    # Plugins register through the "calculator.operations" entry point group (name = operation name,
+    # value = Operation subclass); the group is only scanned the first time a name is not found. Plugins and
+    # aliases cannot take REPL command names, and a plugin that fails to load is logged and skipped.
+    ENTRY_POINT_GROUP = "calculator.operations"
+    RESERVED_NAMES = frozenset({"history", "clear", "undo", "redo", "save", "load", "export", "stats", "summary",
+                                "help", "exit"})
     _operations = {
         "add": Addition, "subtract": Subtraction, "multiply": Multiplication,
         "divide": Division, "power": Power, "root": Root, "modulus": Modulus,
         "int_divide": IntegerDivision, "percent": Percentage, "abs_diff": AbsoluteDifference
     }
+    _aliases = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide", "^": "power", "**": "power",
+                "%": "modulus", "//": "int_divide"}
+    _instances: dict[str, Operation] = {}
+    _dispatch: dict[str, Operation] = {}
+    _names: dict[str, str] = {}
+    _plugins_loaded = False
+
+    @classmethod
+    def register(cls, op_name: str, op_class: type, aliases=()):
+        op_name = op_name.lower()
+        cls._operations[op_name] = op_class
+        cls._aliases.update((alias.lower(), op_name) for alias in aliases)
+        cls._build()
+
+    @classmethod
+    def _build(cls):
+        instances = {name: cls._instances.get(name) if type(cls._instances.get(name)) is op_class else op_class()
+                     for name, op_class in cls._operations.items()}
+        names = {name: name for name in instances}
+        names.update((alias, name) for alias, name in cls._aliases.items() if name in instances)
+        cls._instances, cls._names = instances, names
+        cls._dispatch = {alias: instances[name] for alias, name in names.items()}
+
+    @classmethod
+    def load_plugins(cls):
+        # importlib.metadata is only imported here, so startup never pays for scanning installed packages.
+        cls._plugins_loaded = True
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=cls.ENTRY_POINT_GROUP):
+            try:
+                if entry_point.name.lower() in cls.RESERVED_NAMES:
+                    raise OperationError(f"'{entry_point.name}' is a built-in command name.")
+                op_class = entry_point.load()
+                if not (isinstance(op_class, type) and issubclass(op_class, Operation)):
+                    raise OperationError(f"'{entry_point.name}' is not an Operation subclass.")
+                aliases = [alias for alias in getattr(op_class, "aliases", ()) if alias.lower() not in cls.RESERVED_NAMES]
+                cls.register(entry_point.name, op_class, aliases)
+            except Exception as e:
+                logging.getLogger("CalculatorApp").error(f"Skipping operation plugin '{entry_point.name}': {e}")
+
+    @classmethod
+    def resolve(cls, op_name: str) -> str:
+        # Operation name for a name or alias, or None; the one dict lookup the REPL does per line.
+        name = cls._names.get(op_name)
+        if name is None:
+            name = cls._names.get(op_name.lower())
+            if name is None and not cls._plugins_loaded and op_name.lower() not in cls.RESERVED_NAMES:
+                cls.load_plugins()
+                name = cls._names.get(op_name.lower())
+        return name
 
     @staticmethod
     def get_operations():
         return OperationFactory._operations.keys()
-    
+
     @staticmethod
-    def create(op_name: str) -> Operation:
-        op_class = OperationFactory._operations.get(op_name.lower())
-        if not op_class: raise ValueError(f"Unknown operation: '{op_name}'")
-        return op_class()
\ No newline at end of file
+    def get_aliases() -> dict[str, str]:
+        return dict(OperationFactory._aliases)
+
+    @classmethod
+    def create(cls, op_name: str) -> Operation:
+        operation = cls._dispatch.get(op_name)
+        if operation is None:
+            name = cls.resolve(op_name)
+            if name is None: raise OperationError(f"Unknown operation: '{op_name}'")
+            operation = cls._instances[name]
+        return operation
+
+OperationFactory._build()
@@ -0,0 +1,74 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from app.batch_mode import BatchStats, count_lines, run_command
+from app.exceptions import CalculatorError
+from app.input_validators import operand_error_messages, validate_operands_bulk
+from app.operations import OperationFactory
+
+def evaluate_chunk(lines: list[str], max_input: float, precision: int) -> list[tuple]:
+    # Runs in a worker process. Calculations come back as ("result", op, a, b, result) or ("error", message);
+    # every other command is returned as ("command", name, args) and run in order by the parent.
+    # Operands of the whole chunk are validated in one bulk pass.
+    resolve, records = OperationFactory.resolve, []
+    commands = [[parts[0].lower(), *parts[1:]] for parts in map(str.split, lines) if parts]
+    op_names = [resolve(parts[0]) for parts in commands]
+    calculations = [parts for parts, op_name in zip(commands, op_names) if op_name]
+    a_values, b_values, codes = validate_operands_bulk([parts[1:] for parts in calculations], max_input)
+    messages = operand_error_messages(max_input)
+    rows = iter(zip(a_values.tolist(), b_values.tolist(), codes.tolist()))
+    for parts, op_name in zip(commands, op_names):
+        if not op_name:
+            records.append(("command", parts[0], parts[1:]))
+            continue
+        a, b, code = next(rows)
+        if code:
+            records.append(("error", messages[code - 1]))
+            continue
+        try:
+            records.append(("result", op_name, a, b, round(OperationFactory.create(op_name).execute(a, b), precision)))
+        except (CalculatorError, IndexError) as e:
+            records.append(("error", str(e)))
+    return records
+
+def chunks(lines, size: int):
+    lines = iter(lines)
+    while chunk := list(islice(lines, size)): yield chunk
+
+def ordered_results(executor, func, items, window: int):
+    # Like executor.map, but keeps at most `window` chunks in flight so large inputs are streamed.
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window: yield pending.popleft().result()
+    while pending: yield pending.popleft().result()
+
+def merge_records(repl, records):
+    app = repl.app
+    for kind, *fields in records:
+        if kind == "result":
+            yield f"Result: {app.record_calculation(*fields)}\n"
+        elif kind == "error":
+            yield f"Error: {fields[0]}\n"
+        elif fields[0] == "exit":
+            return
+        else:
+            yield run_command(repl, *fields)
+
+def run_parallel_batch(repl, lines, out, workers: int, chunk_size: int) -> BatchStats:
+    # Chunks are evaluated out of process and merged back in input order, so history and output match run_batch.
+    config, stats, start = repl.app.config, BatchStats(), time.perf_counter()
+    evaluate = partial(evaluate_chunk, max_input=config.max_input, precision=config.precision)
+    workers = max(workers, 1)
+    executor = ProcessPoolExecutor(workers)
+    try:
+        with repl.app.deferred_autosave():
+            results = ordered_results(executor, evaluate, chunks(count_lines(lines, stats), max(chunk_size, 1)), 2 * workers)
+            out.writelines(merge_records(repl, (record for chunk in results for record in chunk)))
+            out.flush()
+    finally:
+        executor.shutdown(cancel_futures=True)
+    stats.seconds = time.perf_counter() - start
+    return stats
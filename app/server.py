@@ -0,0 +1,109 @@
+"""Asyncio TCP front end: one shared CalculatorApp, one session per connection.
+
+Protocol: clients send REPL commands, one per line, and may pipeline any number of them. Each response is
+the command's output lines followed by a line holding a single ".". `exit` (or EOF) closes the connection.
+
+    python -m app.server --host 127.0.0.1 --port 8765
+"""
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from app.batch_mode import execute_commands
+from app.calculator import CalculatorApp, REPL
+
+TERMINATOR = ".\n"
+READ_SIZE = 1 << 16
+MAX_LINE = 1 << 16
+
+class SessionApp(CalculatorApp):
+    # Per-connection history and undo stack. Calculations are also recorded in the shared app, whose observers
+    # persist them; save/load/export/stats act on that shared history.
+    def __init__(self, shared: CalculatorApp):
+        super().__init__(parent=shared)
+        self.shared = shared
+
+    def record_calculation(self, op_name: str, a: float, b: float, result: float):
+        super().record_calculation(op_name, a, b, result)
+        return self.shared.record_calculation(op_name, a, b, result)
+
+    def save_history(self): self.shared.save_history()
+    def load_history(self): self.shared.load_history()
+    def export_history(self): self.shared.export_history()
+    def stats(self) -> dict: return self.shared.stats()
+    def show_stats(self, action: str = "", path: str = None): self.shared.show_stats(action, path)
+    def close(self): pass
+
+
+class CalculatorServer:
+    def __init__(self, app: CalculatorApp):
+        self.app = app
+        self.sessions = 0
+        self.requests = 0
+        # Commands run off the event loop so autosave and other disk writes don't stall every connection. One
+        # worker keeps them serialized: run_command redirects the process-wide stdout while it captures output.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calculator-server")
+
+    def respond(self, repl: REPL, line: bytes) -> str:
+        parts = line.decode(self.app.config.encoding, errors="replace").split()
+        if not parts: return ""
+        self.requests += 1
+        return "".join(execute_commands(repl, [[parts[0].lower(), *parts[1:]]])).lstrip("\n") + TERMINATOR
+
+    def respond_all(self, repl: REPL, lines: list[bytes]) -> str:
+        return "".join(self.respond(repl, line) for line in lines)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Every complete line in a read is answered, then the responses go out in a single write.
+        loop, repl, pending = asyncio.get_running_loop(), REPL(SessionApp(self.app)), b""
+        self.sessions += 1
+        try:
+            while data := await reader.read(READ_SIZE):
+                *lines, pending = (pending + data).split(b"\n")
+                if len(pending) > MAX_LINE: break
+                exit_at = next((i for i, line in enumerate(lines) if line.strip().lower() == b"exit"), None)
+                responses = await loop.run_in_executor(self.executor, self.respond_all, repl, lines[:exit_at])
+                writer.write(responses.encode(self.app.config.encoding))
+                await writer.drain()
+                if exit_at is not None: break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.app.logger.error(f"Unexpected session error: {e}", exc_info=True)
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def start(self, host: str, port: int):
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+async def serve(app: CalculatorApp, host: str, port: int):
+    calculator_server = CalculatorServer(app)
+    server = await calculator_server.start(host, port)
+    for sock in server.sockets:
+        print("Serving on {}:{}".format(*sock.getsockname()[:2]), flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        calculator_server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Calculator TCP line server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port (printed on startup)")
+    args = parser.parse_args(argv)
+    app = CalculatorApp()
+    try:
+        asyncio.run(serve(app, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
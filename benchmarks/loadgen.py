@@ -0,0 +1,79 @@
+"""Loopback load generator for app.server.
+
+Starts a server in a subprocess (unless --port is given), opens --connections sessions that each keep
+--pipeline requests in flight, and reports requests/sec and latency percentiles as JSON.
+
+    python -m benchmarks.loadgen --connections 32 --requests 2000 --pipeline 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+COMMANDS = ["add {i} 2", "multiply {i} 1.5", "power 2 {p}", "divide {i} 3", "history --op power --limit 5"]
+
+async def client(host: str, port: int, requests: int, depth: int, latencies: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = deque()
+    def send(i: int):
+        sent.append(time.perf_counter())
+        writer.write((COMMANDS[i % len(COMMANDS)].format(i=i, p=i % 16) + "\n").encode())
+    for i in range(min(depth, requests)): send(i)
+    next_request, done = len(sent), 0
+    while done < requests:
+        line = await reader.readline()
+        if not line: raise ConnectionError("Server closed the connection.")
+        if line != b".\n": continue
+        latencies.append(time.perf_counter() - sent.popleft())
+        done += 1
+        if next_request < requests:
+            send(next_request)
+            next_request += 1
+    writer.write(b"exit\n")
+    writer.close()
+
+async def run_load(host: str, port: int, connections: int, requests: int, depth: int) -> dict:
+    latencies, start = [], time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, depth, latencies) for _ in range(connections)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    at = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+    return {"connections": connections, "requests": len(latencies), "pipeline": depth, "seconds": seconds,
+            "requests_per_sec": len(latencies) / seconds, "p50_ms": at(0.50), "p99_ms": at(0.99), "max_ms": at(1.0)}
+
+def start_server(tmp: str) -> tuple[subprocess.Popen, int]:
+    env = {**os.environ, "CALCULATOR_LOG_DIR": os.path.join(tmp, "logs"),
+           "CALCULATOR_HISTORY_DIR": os.path.join(tmp, "data")}
+    server = subprocess.Popen([sys.executable, "-m", "app.server", "--port", "0"], stdout=subprocess.PIPE, text=True,
+                              env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for line in server.stdout:
+        if line.startswith("Serving on"): return server, int(line.rsplit(":", 1)[1])
+    raise RuntimeError("Server exited before it started listening.")
+
+def measure(connections: int, requests: int, depth: int, host: str = "127.0.0.1", port: int = None) -> dict:
+    if port: return asyncio.run(run_load(host, port, connections, requests, depth))
+    with tempfile.TemporaryDirectory() as tmp:
+        server, port = start_server(tmp)
+        try: return asyncio.run(run_load(host, port, connections, requests, depth))
+        finally:
+            server.terminate()
+            server.wait()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Loopback load generator for the calculator server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="existing server to target (default: start one)")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=8, help="requests in flight per connection")
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.connections, args.requests, args.pipeline, args.host, args.port), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
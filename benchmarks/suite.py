@@ -0,0 +1,248 @@
+"""Offline benchmark suite for the calculator's hot paths.
+
+Every metric is a rate (higher is better). Results are printed as JSON and can be compared
+against a stored baseline; the run fails when a metric drops by more than the threshold.
+
+    python -m benchmarks.suite --quick
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.3
+    python -m benchmarks.suite --quick --output benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+BENCHMARKS = {}
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+def rate(func, n: int, repeat: int = 3) -> float:
+    # Best-of-`repeat` operations per second for func(), which performs n operations.
+    best = min(_timed(func) for _ in range(repeat))
+    return n / best if best else float("inf")
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+@contextlib.contextmanager
+def sandbox(**env):
+    # Points the app at a throwaway directory and silences its prints.
+    with tempfile.TemporaryDirectory() as tmp:
+        values = {"CALCULATOR_LOG_DIR": os.path.join(tmp, "logs"), "CALCULATOR_HISTORY_DIR": os.path.join(tmp, "data"),
+                  **{key: str(value) for key, value in env.items()}}
+        with patch.dict(os.environ, values), contextlib.redirect_stdout(io.StringIO()):
+            yield tmp
+
+def sample_calculations(n: int, seed: int = 7):
+    from app.calculation import Calculation
+    rng = random.Random(seed)
+    ops = ["add", "subtract", "multiply", "divide", "power", "root"]
+    return [Calculation(rng.uniform(1, 100), rng.randint(1, 5), rng.choice(ops), rng.uniform(1, 1000)) for _ in range(n)]
+
+
+@benchmark
+def execute_calculation(sizes):
+    from app.calculator import CalculatorApp
+    n, results = sizes["calls"], {}
+    for label, env in (("no_autosave", {"CALCULATOR_AUTO_SAVE": "false"}),
+                       ("journal_autosave", {"CALCULATOR_SAVE_MODE": "journal"}),
+                       ("snapshot_autosave", {"CALCULATOR_SAVE_MODE": "snapshot"}),
+                       ("sqlite_autosave", {"CALCULATOR_HISTORY_FORMAT": "sqlite"})):
+        with sandbox(CALCULATOR_LOG_SAMPLE_RATE=0, **env):
+            app = CalculatorApp()
+            results[f"{label}_calls_per_sec"] = rate(lambda: [app.execute_calculation("add", i, 2.5) for i in range(n)], n)
+            app.close()
+    return results
+
+@benchmark
+def history_save_load(sizes):
+    from app.history import HistoryManager
+    results = {}
+    for rows in sizes["history_rows"]:
+        history = HistoryManager(rows)
+        for calc in sample_calculations(rows): history.add(calc)
+        with sandbox() as tmp:
+            for ext in ("csv", "bin", "db"):
+                path = os.path.join(tmp, f"history.{ext}")
+                results[f"save_{ext}_{rows}_rows_per_sec"] = rate(lambda: history.save(path, "utf-8"), rows)
+                results[f"load_{ext}_{rows}_rows_per_sec"] = rate(lambda: HistoryManager(rows).load(path, "utf-8"), rows)
+            history.close()
+    return results
+
+@benchmark
+def caretaker_undo_redo(sizes):
+    from app.calculator_memento import Caretaker
+    from app.history import HistoryManager
+    results, steps = {}, sizes["undo_steps"]
+    for rows in sizes["undo_history_rows"]:
+        history = HistoryManager(rows)
+        caretaker = Caretaker(history, max_undo=steps)
+        caretaker.save()
+        for calc in sample_calculations(rows):
+            history.add(calc)
+            caretaker.save()
+        def cycle():
+            for _ in range(steps): caretaker.undo()
+            for _ in range(steps): caretaker.redo()
+        results[f"undo_redo_{rows}_rows_steps_per_sec"] = rate(cycle, 2 * steps)
+    return results
+
+@benchmark
+def history_summary(sizes):
+    # An add followed by a summary; flat across history sizes because the aggregates are updated in place.
+    from app.calculation import Calculation
+    from app.history import HistoryManager
+    n, results = sizes["calls"], {}
+    for rows in sizes["history_rows"]:
+        history = HistoryManager(rows)
+        for calc in sample_calculations(rows): history.add(calc)
+        history.summary()
+        calc = Calculation(1.0, 2.0, "add", 3.0)
+        def cycle():
+            for _ in range(n): history.add(calc); history.summary()
+        results[f"add_summary_{rows}_rows_per_sec"] = rate(cycle, n)
+    return results
+
+@benchmark
+def operation_dispatch(sizes):
+    from app.operations import OperationFactory
+    # Shared instances through the dispatch table, against the old lower-case lookup and new Operation per call.
+    n, names = sizes["calls"], list(OperationFactory.get_operations())
+    classes = dict(OperationFactory._operations)
+    return {"create_per_sec": rate(lambda: [OperationFactory.create(names[i % len(names)]) for i in range(n)], n),
+            "resolve_alias_per_sec": rate(lambda: [OperationFactory.resolve("+") for _ in range(n)], n),
+            "dispatch_execute_per_sec": rate(lambda: [OperationFactory.create("add").execute(i, 2) for i in range(n)], n),
+            "instantiate_execute_per_sec": rate(lambda: [classes["Add".lower()]().execute(i, 2) for i in range(n)], n)}
+
+@benchmark
+def validate_operands(sizes):
+    # Scalar calls against the bulk path on the same tokens, and the byte-buffer front end on the same lines.
+    from app.input_validators import parse_operand_buffer, validate_operands, validate_operands_bulk
+    n = sizes["calls"]
+    args = [[str(i), f"{i}.5"] for i in range(n)]
+    buffer = "".join(f"add {a} {b}\n" for a, b in args).encode()
+    return {"pairs_per_sec": rate(lambda: [validate_operands(pair, 1e9) for pair in args], n),
+            "bulk_pairs_per_sec": rate(lambda: validate_operands_bulk(args, 1e9), n),
+            "buffer_lines_per_sec": rate(lambda: parse_operand_buffer(buffer, 1e9), n)}
+
+@benchmark
+def calculation_create(sizes):
+    from app.calculation import Calculation
+    n = sizes["calls"]
+    return {"records_per_sec": rate(lambda: [Calculation(1.0, 2.0, "add", 3.0) for _ in range(n)], n)}
+
+@benchmark
+def repl_commands(sizes):
+    from app.batch_mode import run_batch
+    from app.calculator import REPL
+    n = sizes["calls"]
+    script = [f"{op} {i % 97 + 1} {i % 5 + 1}\n" for i, op in zip(range(n), ["add", "multiply", "power", "divide"] * n)]
+    script[::50] = ["undo\n"] * len(script[::50])
+    with sandbox(CALCULATOR_LOG_SAMPLE_RATE=0):
+        repl = REPL()
+        result = {"lines_per_sec": rate(lambda: run_batch(repl, script, io.StringIO()), n)}
+        repl.app.close()
+    return result
+
+@benchmark
+def parallel_batch(sizes):
+    # Scaling across 1..cpu_count worker processes; the sequential engine is the reference point.
+    from app.batch_mode import run_batch
+    from app.calculator import REPL
+    from app.parallel import run_parallel_batch
+    n, cpus = sizes["parallel_lines"], os.cpu_count() or 1
+    script = [f"{op} {i % 97 + 1} {i % 5 + 1}\n" for i, op in zip(range(n), ["add", "multiply", "power", "root"] * n)]
+    with sandbox(CALCULATOR_LOG_SAMPLE_RATE=0, CALCULATOR_AUTO_SAVE="false"):
+        repl = REPL()
+        results = {"sequential_lines_per_sec": rate(lambda: run_batch(repl, script, io.StringIO()), n, repeat=1)}
+        for workers in sorted({1, *(2 ** k for k in range(1, cpus.bit_length())), cpus}):
+            results[f"workers_{workers}_lines_per_sec"] = rate(
+                lambda: run_parallel_batch(repl, script, io.StringIO(), workers, sizes["chunk_size"]), n, repeat=1)
+        repl.app.close()
+    return results
+
+@benchmark
+def threaded_calculation(sizes):
+    # Thread-safe mode across 1..N threads: the locked record step versus pure Operation.execute calls.
+    # On a GIL build the pure-compute numbers stay flat; the lock only has to avoid serializing them further.
+    import threading
+    from app.calculator import CalculatorApp
+    from app.operations import OperationFactory
+    n, results = sizes["calls"], {}
+    def threaded(work, threads: int):
+        pool = [threading.Thread(target=work, args=(n // threads,)) for _ in range(threads)]
+        def run():
+            for thread in pool: thread.start()
+            for thread in pool: thread.join()
+        return run
+    def compute(count): [OperationFactory.create("power").execute(1.0001, 3) for _ in range(count)]
+    with sandbox(CALCULATOR_LOG_SAMPLE_RATE=0, CALCULATOR_AUTO_SAVE="false", CALCULATOR_THREAD_SAFE="true"):
+        app = CalculatorApp()
+        def calculate(count): [app.execute_calculation("power", 1.0001, 3) for _ in range(count)]
+        for threads in (1, 2, 4):
+            results[f"app_{threads}_threads_calls_per_sec"] = rate(lambda: threaded(calculate, threads)(), n, repeat=1)
+            results[f"compute_{threads}_threads_calls_per_sec"] = rate(lambda: threaded(compute, threads)(), n, repeat=1)
+        app.close()
+    return results
+
+@benchmark
+def server_loopback(sizes):
+    from benchmarks.loadgen import measure
+    result = measure(sizes["connections"], sizes["requests_per_connection"], depth=8)
+    return {"requests_per_sec": result["requests_per_sec"]}
+
+
+SIZES = {
+    "full": {"calls": 50_000, "history_rows": [100, 10_000, 1_000_000], "undo_history_rows": [100, 10_000, 100_000],
+             "undo_steps": 500, "parallel_lines": 200_000, "chunk_size": 5000,
+             "connections": 32, "requests_per_connection": 2000},
+    "quick": {"calls": 5_000, "history_rows": [100, 10_000], "undo_history_rows": [100, 10_000], "undo_steps": 100,
+              "parallel_lines": 20_000, "chunk_size": 2000, "connections": 8, "requests_per_connection": 500},
+}
+
+def run(names, sizes) -> dict:
+    return {name: BENCHMARKS[name](sizes) for name in names}
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    # Metrics missing from either side are ignored so the suite can grow without invalidating baselines.
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected and value < expected * (1 - threshold):
+                regressions.append(f"{name}.{metric}: {value:,.0f} vs baseline {expected:,.0f} "
+                                   f"({value / expected - 1:+.0%})")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calculator hot-path benchmarks.")
+    parser.add_argument("--quick", action="store_true", help="use small sizes (seconds instead of minutes)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCHMARK_THRESHOLD", "0.3")),
+                        help="allowed fractional drop before a metric counts as a regression (default 0.3)")
+    args = parser.parse_args(argv)
+
+    results = run(args.only or list(BENCHMARKS), SIZES["quick" if args.quick else "full"])
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f: json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f: regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions: print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
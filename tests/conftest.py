@@ -0,0 +1,15 @@
+import pytest
+from app.calculator import CalculatorApp
+
+@pytest.fixture
+def app_env(monkeypatch, tmp_path):
+    # Keeps logs and history under tmp_path; tests set any further CALCULATOR_* variables on the returned monkeypatch.
+    monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path / "data"))
+    return monkeypatch
+
+@pytest.fixture
+def app(app_env):
+    app = CalculatorApp()
+    yield app
+    app.close()
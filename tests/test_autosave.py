@@ -0,0 +1,87 @@
+import time
+import pytest
+from unittest.mock import patch
+from app.autosave import AutosaveScheduler
+from app.calculator import CalculatorApp, REPL
+from app.calculation import Calculation
+from app.history import HistoryManager, journal_path
+
+def test_requests_within_debounce_coalesce_into_one_save():
+    saves = []
+    scheduler = AutosaveScheduler(lambda: saves.append(time.monotonic()), debounce=0.05, max_delay=1.0)
+    for _ in range(20): scheduler.mark_dirty()
+    time.sleep(0.2)
+    assert len(saves) == 1
+    assert scheduler.stats() == {"requests": 20, "saves": 1, "failures": 0, "pending": False}
+    scheduler.close()
+
+def test_max_delay_bounds_a_continuous_stream():
+    saves = []
+    scheduler = AutosaveScheduler(lambda: saves.append(time.monotonic()), debounce=0.05, max_delay=0.1)
+    start = time.monotonic()
+    while time.monotonic() - start < 0.35:
+        scheduler.mark_dirty()
+        time.sleep(0.01)
+    scheduler.close()
+    assert len(saves) >= 3
+    assert saves[0] - start < 0.3
+
+def test_close_flushes_pending_state():
+    saves = []
+    scheduler = AutosaveScheduler(lambda: saves.append(1), debounce=60, max_delay=60)
+    scheduler.mark_dirty()
+    assert scheduler.pending and not saves
+    scheduler.close()
+    assert saves == [1] and not scheduler.pending
+    assert not scheduler.flush()
+
+def test_invalid_intervals():
+    with pytest.raises(ValueError): AutosaveScheduler(lambda: None, debounce=0, max_delay=1)
+    with pytest.raises(ValueError): AutosaveScheduler(lambda: None, debounce=2, max_delay=1)
+
+def test_invalid_fsync_policy():
+    with pytest.raises(ValueError): HistoryManager(10, fsync_policy="sometimes")
+
+def test_fsync_always_syncs_every_write(tmp_path):
+    history = HistoryManager(10, fsync_policy="always")
+    with patch("os.fsync") as fsync:
+        history.save(tmp_path / "history.csv", "utf-8")
+        history.save(tmp_path / "history.csv", "utf-8")
+    assert history.save_stats.fsyncs == 2 and fsync.called
+    assert history.save_stats.snapshots == 2 and history.save_stats.bytes_written > 0
+
+def test_debounced_app_saves_once_and_flushes_on_exit(app_env):
+    app_env.setenv("CALCULATOR_SAVE_MODE", "snapshot")
+    app_env.setenv("CALCULATOR_AUTOSAVE_DEBOUNCE", "60")
+    app_env.setenv("CALCULATOR_AUTOSAVE_MAX_DELAY", "60")
+    repl = REPL()
+    app = repl.app
+    for i in range(50): app.execute_calculation("add", i, 1)
+    assert app.stats()["autosave"]["requests"] == 50
+    assert app.stats()["autosave"]["snapshots"] == 0
+    with patch("builtins.input", side_effect=["exit"]), patch("builtins.print"): repl.run()
+    assert app.scheduler.saves == 1
+    reloaded = CalculatorApp()
+    assert len(reloaded.history.get_history()) == 50
+    reloaded.close()
+
+def test_fsync_interval_syncs_the_tail_of_a_burst(tmp_path):
+    history = HistoryManager(10, fsync_policy="interval", fsync_interval=0.05)
+    path = tmp_path / "history.csv"
+    with patch("app.history.fsync_path") as fsync_path, patch("os.fsync"):
+        for i in range(3):
+            calc = Calculation(i, 1, "add", i + 1)
+            history.add(calc)
+            history.record("calculation", path, "utf-8", calc)
+        assert history.save_stats.fsyncs == 1 and not fsync_path.called
+        time.sleep(0.2)
+        assert history.save_stats.fsyncs == 2
+        fsync_path.assert_called_once_with(journal_path(path))
+        # close() syncs a pending tail right away instead of waiting for the timer.
+        for i in range(2):
+            calc = Calculation(9, i, "add", 9 + i)
+            history.add(calc)
+            history.record("calculation", path, "utf-8", calc)
+        history.close()
+        assert history.save_stats.fsyncs == 4 and fsync_path.call_count == 2
+    assert history._fsync_timer is None
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from app.batch import evaluate
+from app.calculator import CalculatorApp
+from app.exceptions import OperationError, ValidationError
+from app.operations import OperationFactory
+
+@pytest.fixture
+def app(app_env):
+    app_env.setenv("CALCULATOR_MAX_HISTORY_SIZE", "5")
+    app = CalculatorApp()
+    yield app
+    app.close()
+
+A = [10, -27, 2, 7.5, -4, 0, 100]
+B = [3, 3, 10, 2, 2, 5, -0.5]
+
+@pytest.mark.parametrize("op_name", list(OperationFactory.get_operations()))
+def test_batch_matches_scalar(op_name):
+    batch = evaluate(op_name, A, B, 4)
+    operation = OperationFactory.create(op_name)
+    for i, (a, b) in enumerate(zip(A, B)):
+        try:
+            expected = round(operation.execute(a, b), 4)
+        except OperationError as e:
+            assert batch.error_message(i) == str(e)
+        else:
+            assert batch.error_message(i) is None
+            assert batch.results[i] == pytest.approx(expected)
+
+def test_batch_rounding_matches_scalar():
+    rng = np.random.default_rng(5)
+    a = np.round(rng.uniform(0, 100, 2000), 5)
+    batch = evaluate("add", a, np.zeros_like(a), 4)
+    assert batch.results.tolist() == [round(x + 0.0, 4) for x in a.tolist()]
+    assert evaluate("add", [23.30845], [0], 4).results.tolist() == [round(23.30845, 4)] == [23.3085]
+
+def test_batch_error_masks():
+    batch = evaluate("divide", [1, 2, 3], [1, 0, 3], 4)
+    assert batch.errors.tolist() == [False, True, False]
+    assert batch.error_count == 1
+    assert np.isnan(batch.results[1])
+    assert batch.error_message(1) == "Division by zero."
+
+def test_mixed_batch():
+    batch = evaluate(["add", "root", "modulus", "add"], [1, -4, 5, 2], [2, 2, 0, 2], 4)
+    assert batch.results[[0, 3]].tolist() == [3.0, 4.0]
+    assert batch.error_message(1) == "Even root of a negative number."
+    assert batch.error_message(2) == "Modulus by zero."
+
+def test_batch_records_operation_names_for_aliases(app):
+    app.execute_batch("+", [1, 2], [1, 1])
+    app.execute_batch_mixed(["*", "add", "ADD"], [2, 3, 4], [2, 2, 2])
+    assert [calc.operation_name for calc in app.history.get_history()] == ["add", "add", "multiply", "add", "add"]
+    assert list(app.history.summary()["operations"]) == ["add", "multiply"]
+    app.close()
+
+def test_batch_shape_mismatch():
+    with pytest.raises(ValidationError):
+        evaluate("add", [1, 2], [1], 4)
+
+def test_app_execute_batch_updates_history_once(app):
+    observed = []
+    app.attach(type("Spy", (), {"update": lambda self, event, data: observed.append(event)})())
+    app.execute_batch("divide", [1, 2, 3], [1, 0, 4])
+    app.execute_batch_mixed(["add", "multiply"], [1, 2], [1, 3])
+    assert [c.result for c in app.history.get_history()] == [1.0, 0.75, 2.0, 6.0]
+    assert observed == ["batch", "batch"]
+    app.undo()
+    assert len(app.history.get_history()) == 2
+
+def test_batch_journal_replay(app):
+    app.execute_batch("add", range(4), range(4))
+    app.execute_calculation("add", 1, 1)
+    app.execute_batch("add", range(7), range(7))
+    app.undo()
+    reloaded = CalculatorApp()
+    assert [c.result for c in reloaded.history.get_history()] == [0.0, 2.0, 4.0, 6.0, 2.0]
+    assert reloaded.history.get_history().values("result") == app.history.get_history().values("result")
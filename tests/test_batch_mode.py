@@ -0,0 +1,96 @@
+import io
+import pytest
+from unittest.mock import patch
+from app.batch_mode import run_batch
+from app.calculator import REPL
+
+@pytest.fixture
+def repl(app_env):
+    return REPL()
+
+def test_run_batch_output(repl):
+    out = io.StringIO()
+    stats = run_batch(repl, ["add 2 3\n", "\n", "DIVIDE 1 0\n", "undo\n", "foo\n", "add 1\n", "exit\n", "add 9 9\n"], out)
+    assert out.getvalue().splitlines() == [
+        "Result: 5.0", "Error: Division by zero.", "Undo successful.",
+        "Unknown command: 'foo'", "Error: Exactly two numerical inputs are required.",
+    ]
+    assert stats.lines == 7
+    assert stats.lines_per_sec > 0
+
+def test_run_batch_saves_once(repl):
+    with patch.object(repl.app.history, "save") as mock_save, \
+         patch.object(repl.app.history, "record") as mock_record:
+        run_batch(repl, (f"add {i} 1" for i in range(50)), io.StringIO())
+    mock_record.assert_not_called()
+    mock_save.assert_called_once()
+    assert len(repl.app.history.get_history()) == 50
+
+def test_history_query_command(repl):
+    out = io.StringIO()
+    lines = [f"{op} {i} 2\n" for i, op in enumerate(["add", "power"] * 5)]
+    run_batch(repl, lines + ["history --op power --result '>10' --limit 2\n", "history --op nope\n"], out)
+    output = out.getvalue().splitlines()
+    assert [line.split(": ", 1)[1] for line in output if "Calculation(" in line] == \
+        ["Calculation(7.0, 2.0, 'power', 49.0)", "Calculation(9.0, 2.0, 'power', 81.0)"]
+    assert "Page 1 of 2 (3 matches)" in output
+    assert output[-1] == "No matching calculations."
+
+def test_operator_aliases(repl):
+    out = io.StringIO()
+    run_batch(repl, ["+ 2 3\n", "** 2 3\n", "// 7 2\n"], out)
+    assert out.getvalue().splitlines() == ["Result: 5.0", "Result: 8.0", "Result: 3.0"]
+    assert [calc.operation_name for calc in repl.app.history.get_history()] == ["add", "power", "int_divide"]
+
+def test_summary_command(repl):
+    out = io.StringIO()
+    run_batch(repl, ["summary\n", "add 2 3\n", "multiply 2 4\n", "add 1 1\n", "undo\n", "summary\n", "summary +\n",
+                     "summary root\n", "summary a b\n"], out)
+    output = out.getvalue().splitlines()
+    assert output[0] == "History is empty." and output[4] == "Undo successful."
+    assert output[6].split() == ["add", "1", "5", "5", "5", "5"]
+    assert output[7].split() == ["multiply", "1", "8", "8", "8", "8"]
+    assert output[8].split() == ["all", "2", "13", "6.5", "5", "8"]
+    assert output[10].split() == ["add", "1", "5", "5", "5", "5"]
+    assert output[11:] == ["No calculations for 'root'.", "Error: Usage: summary [operation]"]
+
+def test_commands_do_not_load_plugins(repl, monkeypatch):
+    from app.operations import OperationFactory
+    monkeypatch.setattr(OperationFactory, "_plugins_loaded", False)
+    def fail(): raise AssertionError("plugins scanned")
+    monkeypatch.setattr(OperationFactory, "load_plugins", fail)
+    out = io.StringIO()
+    run_batch(repl, ["add 1 2\n", "history\n", "undo\n", "summary\n"], out)
+    assert "Undo successful." in out.getvalue()
+
+def test_repl_closes_app_on_unexpected_error(repl, capsys):
+    with patch("builtins.input", side_effect=["add 1 2"]), \
+         patch.object(repl.app, "execute_calculation", side_effect=RuntimeError("boom")), \
+         patch.object(repl.app, "close") as mock_close:
+        repl.run()
+    mock_close.assert_called_once()
+    assert "An unexpected error occurred" in capsys.readouterr().out
+    repl.app.close()
+
+def test_summary_command_with_nan_results(repl):
+    out = io.StringIO()
+    run_batch(repl, ["add nan 1\n", "summary\n", "multiply 2 3\n", "summary\n"], out)
+    output = out.getvalue().splitlines()
+    assert output[2].split() == ["add", "1", "nan", "nan", "-", "-"]
+    assert output[3].split() == ["all", "1", "nan", "nan", "-", "-"]
+    assert [line.split() for line in output[-3:]] == [["add", "1", "nan", "nan", "-", "-"],
+                                                      ["multiply", "1", "6", "6", "6", "6"],
+                                                      ["all", "2", "nan", "nan", "6", "6"]]
+
+def test_history_op_filter_accepts_aliases(repl):
+    out = io.StringIO()
+    run_batch(repl, ["add 1 2\n", "multiply 2 3\n", "history --op +\n"], out)
+    assert [line.split(": ", 1)[1] for line in out.getvalue().splitlines() if "Calculation(" in line] == \
+        ["Calculation(1.0, 2.0, 'add', 3.0)"]
+
+def test_arguments_keep_their_case(repl, tmp_path):
+    out = io.StringIO()
+    path = tmp_path / "Out.json"
+    run_batch(repl, ["add 1 2\n", f"STATS JSON {path}\n", "history --OP add --since 2024-01-01T00:00:00\n"], out)
+    assert path.exists() and not (tmp_path / "out.json").exists()
+    assert "Calculation(1.0, 2.0, 'add', 3.0)" in out.getvalue()
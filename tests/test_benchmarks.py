@@ -0,0 +1,14 @@
+from benchmarks.suite import BENCHMARKS, compare
+
+def test_compare_flags_drops_beyond_threshold():
+    baseline = {"dispatch": {"create_per_sec": 1000.0, "other_per_sec": 100.0}}
+    results = {"dispatch": {"create_per_sec": 600.0, "other_per_sec": 90.0, "new_per_sec": 1.0}}
+    regressions = compare(results, baseline, threshold=0.3)
+    assert len(regressions) == 1 and regressions[0].startswith("dispatch.create_per_sec")
+
+def test_compare_ignores_improvements_and_unknown_benchmarks():
+    assert compare({"a": {"x": 5.0}, "b": {"y": 1.0}}, {"a": {"x": 1.0}}, threshold=0.1) == []
+
+def test_benchmarks_report_rates():
+    result = BENCHMARKS["operation_dispatch"]({"calls": 10})
+    assert result["create_per_sec"] > 0
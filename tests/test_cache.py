@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import patch
+from app.cache import ResultCache
+from app.calculator import CalculatorApp
+from app.exceptions import OperationError
+
+def test_cache_hits_and_evictions():
+    cache = ResultCache(maxsize=2)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.get_or_compute("b", lambda: 2) == 2
+    assert cache.get_or_compute("a", lambda: 99) == 1
+    cache.get_or_compute("c", lambda: 3)
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 4, "evictions": 2, "hit_rate": 0.2}
+
+def test_cache_does_not_store_errors():
+    cache = ResultCache(maxsize=2)
+    def fail(): raise OperationError("Division by zero.")
+    with pytest.raises(OperationError):
+        cache.get_or_compute("x", fail)
+    assert len(cache) == 0
+    assert cache.misses == 1
+
+def test_app_uses_cache(app_env):
+    app_env.setenv("CALCULATOR_CACHE_SIZE", "8")
+    app = CalculatorApp()
+    with patch.object(app, "_compute", wraps=app._compute) as compute:
+        assert app.execute_calculation("power", 2, 10) == 1024
+        assert app.execute_calculation("power", 2, 10) == 1024
+        assert app.execute_calculation("multiply", -0.0, 5) == 0
+    assert compute.call_count == 2
+    assert app.cache.hits == 1
+    assert str(app.history.get_history()[-1].result) == "-0.0"
+    assert len(app.history.get_history()) == 3
@@ -27,3 +27,11 @@ def test_calculation_from_dict():
 def test_calculation_repr():
     calc = Calculation(10, 2, "divide", 5)
     assert repr(calc) == "10.0 divide 2.0 = 5.0"
+
+def test_calculation_is_compact_with_lazy_timestamp():
+    calc = Calculation(1, 2, "add", 3)
+    assert not hasattr(calc, "__dict__")
+    assert calc._iso is None
+    assert abs(calc.created - datetime.now().timestamp()) < 5
+    assert calc.timestamp == datetime.fromtimestamp(calc.created).isoformat()
+    assert Calculation(1, 2, "add", 3, created=calc.created).timestamp == calc.timestamp
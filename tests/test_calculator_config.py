@@ -37,3 +37,24 @@ def test_config_invalid_values(monkeypatch, var_name, bad_value):
     monkeypatch.setenv(var_name, bad_value)
     with pytest.raises(ConfigurationError):
         CalculatorConfig()
+
+def test_config_save_mode(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_SAVE_MODE", "snapshot")
+    assert CalculatorConfig().save_mode == "snapshot"
+    monkeypatch.setenv("CALCULATOR_SAVE_MODE", "sometimes")
+    with pytest.raises(ValueError, match="CALCULATOR_SAVE_MODE"):
+        CalculatorConfig()
+
+def test_config_binary_history_format(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_HISTORY_FORMAT", "binary")
+    config = CalculatorConfig()
+    assert config.history_filepath.endswith("calculation_history.bin")
+    assert config.csv_filepath.endswith("calculation_history.csv")
+
+def test_config_multi_writer_rejects_async_snapshot_observers(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_MULTI_WRITER", "true")
+    monkeypatch.setenv("CALCULATOR_OBSERVER_MODE", "async")
+    assert CalculatorConfig().multi_writer
+    monkeypatch.setenv("CALCULATOR_SAVE_MODE", "snapshot")
+    with pytest.raises(ValueError, match="async observers"):
+        CalculatorConfig()
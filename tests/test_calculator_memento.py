@@ -2,6 +2,13 @@ import pytest
 import pandas as pd
 from app.calculator_memento import Memento, Caretaker
 from app.history import HistoryManager
+from app.calculation import Calculation
+
+def calc(n):
+    return Calculation(n, n, "add", n + n)
+
+def operands(caretaker):
+    return [c.operand_a for c in caretaker._originator.get_history()]
 
 @pytest.fixture
 def caretaker():
@@ -18,20 +25,20 @@ def mementos():
 
 def test_caretaker_save(caretaker):
     caretaker.save()
-    caretaker._originator.add("dummy_calc")
+    caretaker._originator.add(calc(0))
     caretaker.save()
     assert len(caretaker._undo_mementos) == 2
 
 def test_caretaker_undo(caretaker):
     caretaker.save()
-    caretaker._originator.add("calc1")
+    caretaker._originator.add(calc(1))
     caretaker.save()
     caretaker.undo()
     assert len(caretaker._originator.get_history()) == 0
 
 def test_caretaker_redo(caretaker):
     caretaker.save()
-    caretaker._originator.add("calc1")
+    caretaker._originator.add(calc(1))
     caretaker.save()
     
     caretaker.undo()
@@ -39,7 +46,7 @@ def test_caretaker_redo(caretaker):
     
     caretaker.redo()
     assert len(caretaker._originator.get_history()) == 1
-    assert caretaker._originator.get_history()[0] == "calc1"
+    assert caretaker._originator.get_history()[0].operand_a == 1
 
 def test_undo_at_limit(caretaker):
     caretaker.save()
@@ -52,11 +59,49 @@ def test_redo_at_limit(caretaker):
 
 def test_save_clears_redo_stack(caretaker):
     caretaker.save()
-    caretaker._originator.add("calc1")
+    caretaker._originator.add(calc(1))
     caretaker.save()
     caretaker.undo()
     assert len(caretaker._redo_mementos) == 1
     
-    caretaker._originator.add("calc2")
+    caretaker._originator.add(calc(2))
     caretaker.save()
     assert len(caretaker._redo_mementos) == 0
+
+def test_undo_depth_limit():
+    caretaker = Caretaker(HistoryManager(max_history=5), max_undo=2)
+    caretaker.save()
+    for n in (1, 2, 3):
+        caretaker._originator.add(calc(n))
+        caretaker.save()
+    caretaker.undo()
+    caretaker.undo()
+    assert operands(caretaker) == [1]
+    with pytest.raises(IndexError, match="Cannot undo"):
+        caretaker.undo()
+
+def test_undo_restores_evicted_and_cleared_entries():
+    caretaker = Caretaker(HistoryManager(max_history=2))
+    caretaker.save()
+    for n in (1, 2, 3):
+        caretaker._originator.add(calc(n))
+        caretaker.save()
+    caretaker._originator.clear()
+    caretaker.save()
+    caretaker.undo()
+    assert operands(caretaker) == [2, 3]
+    caretaker.undo()
+    assert operands(caretaker) == [1, 2]
+    caretaker.redo()
+    caretaker.redo()
+    assert operands(caretaker) == []
+
+def test_memento_stores_changes_not_history(caretaker):
+    caretaker.save()
+    for i in range(50):
+        caretaker._originator.add(calc(i))
+    caretaker.save()
+    assert len(caretaker._undo_mementos[-1].get_state()) == 50
+    caretaker._originator.add(calc(50))
+    caretaker.save()
+    assert len(caretaker._undo_mementos[-1].get_state()) == 1
@@ -0,0 +1,73 @@
+import threading
+import time
+import pytest
+from app.calculator import CalculatorApp
+from app.dispatch import AsyncDispatcher
+from app.history import HistoryManager
+
+class Recorder:
+    def __init__(self, gate=None):
+        self.events, self.gate = [], gate
+    def update(self, event, data):
+        if self.gate: self.gate.wait()
+        self.events.append((event, data))
+
+def test_async_delivery_in_order():
+    recorder = Recorder()
+    dispatcher = AsyncDispatcher([recorder], maxsize=4)
+    for i in range(20): dispatcher.submit("calculation", i)
+    assert dispatcher.flush(timeout=5)
+    assert [data for _, data in recorder.events] == list(range(20))
+    assert dispatcher.stats()["observers"]["Recorder"]["count"] == 20
+    dispatcher.close()
+
+@pytest.mark.parametrize("policy, expected", [
+    ("drop", [0, None, 1, 2]),
+    ("coalesce", [0, None, 2, 3]),
+])
+def test_backpressure_policies(policy, expected):
+    gate = threading.Event()
+    recorder = Recorder(gate)
+    dispatcher = AsyncDispatcher([recorder], maxsize=2, policy=policy)
+    dispatcher.submit("calculation", 0)
+    dispatcher._cond.acquire(); dispatcher._cond.wait_for(lambda: not dispatcher._queue, 5); dispatcher._cond.release()
+    for i in range(1, 4): dispatcher.submit("calculation", i)
+    gate.set()
+    dispatcher.close()
+    assert [data for _, data in recorder.events] == expected
+    assert recorder.events[1][0] == "resync"
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        AsyncDispatcher([], policy="ignore")
+
+def test_app_async_observers_flush_on_close(app_env):
+    app_env.setenv("CALCULATOR_OBSERVER_MODE", "async")
+    app = CalculatorApp()
+    recorder = Recorder()
+    app.attach(recorder)
+    for i in range(10): app.execute_calculation("add", i, 1)
+    app.close()
+    assert len(recorder.events) == 10
+    reloaded = CalculatorApp()
+    assert len(reloaded.history.get_history()) == 10
+    reloaded.close()
+
+@pytest.mark.parametrize("save_mode", ["journal", "snapshot"])
+def test_async_autosave_reloads_without_duplicates(app_env, save_mode):
+    app_env.setenv("CALCULATOR_OBSERVER_MODE", "async")
+    app_env.setenv("CALCULATOR_SAVE_MODE", save_mode)
+    app_env.setenv("CALCULATOR_JOURNAL_COMPACT_EVERY", "5")
+    app_env.setenv("CALCULATOR_MAX_HISTORY_SIZE", "500")
+    app = CalculatorApp()
+    # Snapshot saves run on the dispatcher worker, so history must be locked against the caller's changes.
+    assert (save_mode == "snapshot") == isinstance(app.history.lock, type(threading.RLock()))
+    # A slow observer keeps the worker behind the caller, so queued events trail the live history.
+    app.attach(type("Slow", (), {"update": lambda self, event, data: time.sleep(0.002)})())
+    for i in range(102): app.execute_calculation("add", i, 1)
+    # Reload what is on disk before close() writes its final snapshot, as a crash would leave it.
+    app.flush_observers()
+    reloaded = HistoryManager(500)
+    reloaded.load(app.config.history_filepath, app.config.encoding)
+    assert reloaded.get_history().values("operand_a") == [float(i) for i in range(102)]
+    app.close()
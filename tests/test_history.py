@@ -1,5 +1,7 @@
-from app.history import HistoryManager
+import pytest
+from app.history import HistoryManager, journal_path
 from app.calculation import Calculation
+from app.calculator_memento import Caretaker
 
 def test_history_add_and_trim():
     history = HistoryManager(max_history=2)
@@ -36,3 +38,174 @@ def test_save_empty_history(tmp_path):
     history.save(file_path, 'utf-8')
     assert file_path.is_file()
     assert file_path.read_text().strip() == "operand_a,operand_b,operation_name,result,timestamp"
+
+def test_journal_replays_on_load(tmp_path):
+    file_path = tmp_path / "history.csv"
+    history1 = HistoryManager(5)
+    history1.save(file_path, 'utf-8')
+    for calc in (Calculation(1, 1, 'add', 2), Calculation(2, 2, 'add', 4)):
+        history1.add(calc)
+        history1.record("calculation", file_path, 'utf-8', calc)
+    assert journal_path(file_path).endswith(".journal")
+
+    history2 = HistoryManager(5)
+    history2.load(file_path, 'utf-8')
+    assert [c.result for c in history2.get_history()] == [2.0, 4.0]
+    assert history2.journal_events == 2
+
+def test_journal_replays_undo_redo_and_clear(tmp_path):
+    file_path = tmp_path / "history.csv"
+    history1 = HistoryManager(2)
+    for calc in (Calculation(1, 1, 'add', 2), Calculation(2, 2, 'add', 4), Calculation(3, 3, 'add', 6)):
+        history1.record("calculation", file_path, 'utf-8', calc)
+    for event in ("undo", "clear", "undo", "undo", "redo"):
+        history1.record(event, file_path, 'utf-8')
+
+    history2 = HistoryManager(2)
+    history2.load(file_path, 'utf-8')
+    assert [c.result for c in history2.get_history()] == [2.0, 4.0]
+
+def test_undo_past_journal_falls_back_to_snapshot(tmp_path):
+    file_path = tmp_path / "history.csv"
+    history = HistoryManager(5)
+    history.add(Calculation(1, 1, 'add', 2))
+    history.record("undo", file_path, 'utf-8')
+    assert file_path.is_file()
+    assert not (tmp_path / "history.journal").exists()
+    assert history.journal_events == 0
+
+def test_history_ring_buffer_columns():
+    history = HistoryManager(max_history=3)
+    for n in range(5):
+        history.add(Calculation(n, 1, 'add' if n % 2 else 'power', n + 1))
+    view = history.get_history()
+    assert len(view) == 3
+    assert view.values("operand_a") == [2.0, 3.0, 4.0]
+    assert [view.op_names[code] for code in view.values("operation_name")] == ['power', 'add', 'power']
+    assert all(segment.readonly for segment in view.column("result"))
+    assert view[-1].result == 5.0
+
+def test_history_view_detects_changes():
+    history = HistoryManager(max_history=3)
+    history.add(Calculation(1, 1, 'add', 2))
+    view = history.get_history()
+    history.add(Calculation(2, 2, 'add', 4))
+    with pytest.raises(RuntimeError):
+        view[0]
+
+def test_history_to_dataframe():
+    history = HistoryManager(5)
+    history.add(Calculation(10, 5, 'add', 15))
+    df = history.to_dataframe()
+    assert list(df.columns) == ["operand_a", "operand_b", "operation_name", "result", "timestamp"]
+    assert df["result"].tolist() == [15.0]
+
+def test_load_reads_only_the_tail(tmp_path):
+    file_path = tmp_path / "history.csv"
+    lines = ["operand_a,operand_b,operation_name,result,timestamp"]
+    lines += [f"{i},1,add,{i + 1},2024-01-01T00:00:00" for i in range(5000)]
+    file_path.write_text("\n".join(lines))
+    history = HistoryManager(10)
+    history.load(file_path, 'utf-8')
+    assert history.get_history().values("operand_a") == [float(i) for i in range(4990, 5000)]
+    assert history.load_stats.rows == 10
+    assert history.load_stats.bytes_read < history.load_stats.file_size / 10
+
+def test_load_header_only(tmp_path):
+    file_path = tmp_path / "history.csv"
+    HistoryManager(5).save(file_path, 'utf-8')
+    history = HistoryManager(5)
+    history.load(file_path, 'utf-8')
+    assert len(history.get_history()) == 0
+
+
+def _indexed_history(n: int, capacity: int) -> HistoryManager:
+    history = HistoryManager(capacity)
+    for i in range(n):
+        history.add(Calculation(i, 2, ["add", "power"][i % 2], float(i), created=1_000_000 + i))
+    return history
+
+def _brute_force(history, op_name=None, result=None, since=None, until=None):
+    from app.history import _in_range
+    return [calc.result for calc in history.get_history()
+            if (op_name is None or calc.operation_name == op_name)
+            and (result is None or _in_range(calc.result, result))
+            and (since is None or calc.created >= since) and (until is None or calc.created <= until)]
+
+def test_query_indexes_follow_eviction_and_undo():
+    history = _indexed_history(10, capacity=8)
+    caretaker = Caretaker(history)
+    caretaker.save()
+    assert history.query(op_name="power")[0] == 4
+    for i in range(10, 16):
+        history.add(Calculation(i, 2, "power", float(i), created=1_000_000 + i))
+        caretaker.save()
+    queries = [{"op_name": "power"}, {"op_name": "add"}, {"result": (10.0, False, None, False)},
+               {"op_name": "power", "result": (None, False, 12.0, True)}, {"since": 1_000_011, "until": 1_000_013},
+               {"op_name": "missing"}]
+    for _ in range(3):
+        for query in queries:
+            total, calcs = history.query(**query)
+            assert [calc.result for calc in calcs] == _brute_force(history, **query) and total == len(calcs)
+        caretaker.undo(); caretaker.undo()
+
+def test_query_pages_count_back_from_newest():
+    history = _indexed_history(50, capacity=100)
+    total, calcs = history.query(op_name="add", limit=10)
+    assert total == 25 and [calc.result for calc in calcs] == [float(i) for i in range(30, 50, 2)]
+    _, calcs = history.query(op_name="add", limit=10, page=3)
+    assert [calc.result for calc in calcs] == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert history.query(limit=10, page=9) == (50, [])
+
+def _expected_summary(history):
+    groups = {}
+    for calc in history.get_history(): groups.setdefault(calc.operation_name, []).append(calc.result)
+    def aggregate(values):
+        ordered = [value for value in values if value == value]
+        return {"count": len(values), "sum": pytest.approx(sum(values), nan_ok=True),
+                "mean": pytest.approx(sum(values) / len(values), nan_ok=True),
+                "min": min(ordered, default=None), "max": max(ordered, default=None)}
+    overall = [value for values in groups.values() for value in values]
+    expected = aggregate(overall) if overall else {"count": 0, "sum": 0.0, "mean": 0.0, "min": None, "max": None}
+    return {**expected, "operations": {name: aggregate(values) for name, values in sorted(groups.items())}}
+
+def test_summary_follows_eviction_undo_redo_and_clear():
+    import random
+    rng = random.Random(3)
+    history = HistoryManager(max_history=6)
+    caretaker = Caretaker(history)
+    caretaker.save()
+    assert history.summary() == _expected_summary(history)
+    for step in range(400):
+        action = rng.random()
+        try:
+            if action < 0.55:
+                result = rng.uniform(-1e6, 1e6) if rng.random() < 0.85 else rng.choice([float("nan"), float("inf"), -float("inf")])
+                history.add(Calculation(1, 2, rng.choice(["add", "power", "root"]), result))
+                caretaker.save()
+            elif action < 0.65:
+                history.add_many([1] * 8, [2] * 8, ["add", "root"] * 4, [rng.uniform(-5, 5) for _ in range(8)], 1.0)
+                caretaker.save()
+            elif action < 0.7:
+                history.clear()
+                caretaker.save()
+            elif action < 0.85: caretaker.undo()
+            else: caretaker.redo()
+        except IndexError:
+            pass
+        assert history.summary() == _expected_summary(history)
+
+def test_summary_survives_load(tmp_path):
+    history = HistoryManager(5)
+    for i in range(7): history.add(Calculation(i, 1, "add" if i % 2 else "multiply", float(i)))
+    assert history.summary()["operations"]["add"] == {"count": 2, "sum": 8.0, "mean": 4.0, "min": 3.0, "max": 5.0}
+    history.save(tmp_path / "history.csv", "utf-8")
+    loaded = HistoryManager(5)
+    loaded.load(tmp_path / "history.csv", "utf-8")
+    assert loaded.summary() == history.summary()
+
+def test_summary_recovers_after_nan_is_evicted():
+    history = HistoryManager(max_history=3)
+    for result in (float("nan"), float("inf"), 7.0, 8.0, 9.0):
+        history.add(Calculation(1, 1, "add", result))
+    assert history.summary()["sum"] == 24.0 and history.summary()["min"] == 7.0
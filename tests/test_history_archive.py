@@ -0,0 +1,88 @@
+import json
+import pytest
+from app.calculation import Calculation
+from app.calculator_memento import Caretaker
+from app.history import HistoryManager
+from app.history_archive import HistoryArchive
+
+def archived_history(tmp_path, max_history=5, **kwargs):
+    archive = HistoryArchive(str(tmp_path / "archive"), **kwargs)
+    return HistoryManager(max_history, archive=archive), archive
+
+def add(history, n, start=0):
+    for i in range(start, start + n):
+        history.add(Calculation(i, 1, 'power' if i % 3 == 0 else 'add', i, created=1_700_000_000 + i))
+
+def test_evicted_rows_rotate_into_segments(tmp_path):
+    history, archive = archived_history(tmp_path, compression="lzma", max_bytes=100, flush_rows=10)
+    add(history, 45)
+    archive.flush()
+    assert len(archive) == 40 and archive.stats()["segments"] == 4
+    assert [row[0] for row in archive.rows(0, 40)] == list(range(40))
+    index = json.loads((tmp_path / "archive" / "index.json").read_text())
+    assert index[0]["file"].endswith(".csv.xz")
+    assert (index[0]["first"], index[-1]["last"]) == (1_700_000_000, 1_700_000_039)
+    reopened = HistoryArchive(str(tmp_path / "archive"), compression="lzma")
+    assert reopened.rows(38, 40) == archive.rows(38, 40)
+
+@pytest.mark.parametrize("flush_rows", [1, 100])
+def test_undo_takes_evicted_rows_back_without_duplicates(tmp_path, flush_rows):
+    history, archive = archived_history(tmp_path, flush_rows=flush_rows)
+    caretaker = Caretaker(history)
+    caretaker.save()
+    for i in range(8):
+        add(history, 1, i)
+        caretaker.save()
+    caretaker.undo(); caretaker.undo()
+    assert [c.operand_a for c in history.get_history()] == [1, 2, 3, 4, 5]
+    caretaker.redo()
+    add(history, 3, 10)
+    archive.flush()
+    assert [row[0] for row in archive.rows(0, len(archive))] == [0, 1, 2, 3, 4]
+    assert [c.operand_a for c in history.get_history()] == [5, 6, 10, 11, 12]
+
+def test_oversized_batch_archives_dropped_rows(tmp_path):
+    history, archive = archived_history(tmp_path)
+    caretaker = Caretaker(history)
+    caretaker.save()
+    add(history, 3)
+    caretaker.save()
+    history.add_many(range(10, 20), [1] * 10, ["add"] * 10, range(10, 20), 1_800_000_000)
+    caretaker.save()
+    assert [row[0] for row in archive.rows(0, len(archive))] == [0, 1, 2, *range(10, 15)]
+    caretaker.undo()
+    assert len(archive) == 0 and len(history) == 3
+
+def test_query_pages_back_into_archive(tmp_path):
+    history, archive = archived_history(tmp_path, max_bytes=50, flush_rows=5)
+    add(history, 30)
+    total, calcs = history.query(limit=10, page=1, archive=True)
+    assert total == 30 and [c.operand_a for c in calcs] == list(range(20, 30))
+    total, calcs = history.query(limit=10, page=3, archive=True)
+    assert [c.operand_a for c in calcs] == list(range(10))
+    assert history.query(limit=10)[0] == 5
+    total, calcs = history.query(op_name="power", since=1_700_000_010, archive=True)
+    assert [c.operand_a for c in calcs] == [12, 15, 18, 21, 24, 27]
+
+def test_save_flushes_archive(tmp_path):
+    history, archive = archived_history(tmp_path)
+    add(history, 7)
+    history.save(tmp_path / "history.csv", "utf-8")
+    assert archive.stats()["pending"] == 0
+    assert HistoryArchive(str(tmp_path / "archive")).rows(0, 2) == archive.rows(0, 2)
+
+def test_undo_tombstones_flushed_rows(tmp_path):
+    history, archive = archived_history(tmp_path, max_history=2, flush_rows=1)
+    caretaker = Caretaker(history)
+    caretaker.save()
+    for i in range(3):
+        add(history, 1, i)
+        caretaker.save()
+    caretaker.undo()
+    assert [c.operand_a for c in history.query(archive=True)[1]] == [0, 1]
+    history.save(tmp_path / "history.csv", "utf-8")
+    reopened = HistoryArchive(str(tmp_path / "archive"))
+    assert len(reopened) == 0 and list(reopened.scan()) == []
+    caretaker.redo()
+    archive.flush()
+    assert [row[0] for row in HistoryArchive(str(tmp_path / "archive")).rows(0, 5)] == [0]
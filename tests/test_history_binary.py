@@ -0,0 +1,46 @@
+import pytest
+from app.calculation import Calculation
+from app.history import HistoryManager
+from app.history_binary import MAGIC, read_binary
+
+def make_history(n, max_history=10):
+    history = HistoryManager(max_history)
+    for i in range(n):
+        history.add(Calculation(i, 2, 'power' if i % 2 else 'add', i * 2))
+    return history
+
+def test_binary_round_trip(tmp_path):
+    file_path = tmp_path / "history.bin"
+    history = make_history(15)
+    history.save(file_path, 'utf-8')
+    assert file_path.read_bytes().startswith(MAGIC)
+
+    loaded = HistoryManager(10)
+    loaded.load(file_path, 'utf-8')
+    original = history.get_history()
+    view = loaded.get_history()
+    for name in ("operand_a", "operand_b", "result"):
+        assert view.values(name) == original.values(name)
+    assert [c.operation_name for c in view] == [c.operation_name for c in original]
+    assert view.values("timestamp") == original.values("timestamp")
+
+def test_binary_reads_only_newest_rows(tmp_path):
+    file_path = tmp_path / "history.bin"
+    make_history(100, max_history=100).save(file_path, 'utf-8')
+    op_names, columns = read_binary(file_path, 5)
+    assert columns["operand_a"].tolist() == [95.0, 96.0, 97.0, 98.0, 99.0]
+    assert [op_names[code] for code in columns["operation_name"]] == ['power', 'add', 'power', 'add', 'power']
+
+def test_binary_imports_existing_csv(tmp_path):
+    make_history(3).save(tmp_path / "history.csv", 'utf-8')
+    history = HistoryManager(10)
+    history.load(tmp_path / "history.bin", 'utf-8')
+    assert history.get_history().values("operand_a") == [0.0, 1.0, 2.0]
+
+def test_binary_rejects_foreign_file(tmp_path, capsys):
+    file_path = tmp_path / "history.bin"
+    file_path.write_bytes(b"x" * 64)
+    history = HistoryManager(10)
+    history.load(file_path, 'utf-8')
+    assert len(history.get_history()) == 0
+    assert "Not a calculator history file" in capsys.readouterr().out
@@ -0,0 +1,124 @@
+import sqlite3
+import pytest
+from app.calculation import Calculation
+from app.calculator import CalculatorApp
+from app.history import HistoryManager
+from app.history_store import CsvStore, SQLiteStore, atomic_write, open_store
+
+def make_history(n, max_history=10):
+    history = HistoryManager(max_history)
+    for i in range(n):
+        history.add(Calculation(i, 2, 'power' if i % 2 else 'add', i * 2, created=1_700_000_000 + i))
+    return history
+
+def rows(history):
+    return [(c.operand_a, c.operand_b, c.operation_name, c.result, c.created) for c in history.get_history()]
+
+def test_open_store_by_extension(tmp_path):
+    assert isinstance(open_store(tmp_path / "h.db", "utf-8"), SQLiteStore)
+    assert isinstance(open_store(tmp_path / "h.csv", "utf-8"), CsvStore)
+
+def test_sqlite_round_trip_reads_last_n(tmp_path):
+    path = tmp_path / "history.db"
+    history = make_history(30, max_history=30)
+    history.save(path, "utf-8")
+    loaded = HistoryManager(10)
+    loaded.load(path, "utf-8")
+    assert rows(loaded) == rows(history)[-10:]
+    assert loaded.load_stats.rows == 10
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[1] for row in connection.execute("PRAGMA index_list(calculations)")}
+        assert {"calculations_timestamp", "calculations_operation_name"} <= indexes
+    history.close(); loaded.close()
+
+def test_sqlite_appends_and_rewrites_on_undo(tmp_path):
+    path = tmp_path / "history.db"
+    history = make_history(3)
+    history.save(path, "utf-8")
+    calc = Calculation(7, 7, "multiply", 49)
+    history.add(calc)
+    history.record("calculation", path, "utf-8", calc)
+    assert history.journal_events == 0 and not (tmp_path / "history.journal").exists()
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM calculations").fetchone()[0] == 4
+    history.revert(history.take_changes()[-1])
+    history.record("undo", path, "utf-8")
+    loaded = HistoryManager(10)
+    loaded.load(path, "utf-8")
+    assert rows(loaded) == rows(history)
+    history.close(); loaded.close()
+
+def test_sqlite_undo_redo_keep_rows_beyond_max_history(tmp_path):
+    from app.calculator_memento import Caretaker
+    path = tmp_path / "history.db"
+    history = HistoryManager(5)
+    history.save(path, "utf-8")
+    caretaker = Caretaker(history)
+    caretaker.save()
+    for i in range(20):
+        calc = Calculation(i, 1, "add", i + 1, created=1_700_000_000 + i)
+        history.add(calc)
+        caretaker.save()
+        history.record("calculation", path, "utf-8", calc)
+    # A batch larger than max_history is one "evict" change.
+    batch = type("Batch", (), {"timestamp": 1_800_000_000.0, "rows": lambda self: [(1.0, 2.0, "multiply", 2.0)] * 7})()
+    history.add_many([1.0] * 7, [2.0] * 7, ["multiply"] * 7, [2.0] * 7, batch.timestamp)
+    caretaker.save()
+    history.record("batch", path, "utf-8", batch)
+    count = lambda: sqlite3.connect(path).execute("SELECT COUNT(*) FROM calculations").fetchone()[0]
+    assert count() == 27
+    for event, expected in (("undo", 20), ("undo", 19), ("redo", 20), ("redo", 27), ("undo", 20)):
+        getattr(caretaker, event)()
+        history.record(event, path, "utf-8")
+        assert count() == expected
+        loaded = HistoryManager(5)
+        loaded.load(path, "utf-8")
+        assert rows(loaded) == rows(history)
+        loaded.close()
+    history.clear()
+    history.record("clear", path, "utf-8")
+    assert count() == 0
+    history.close()
+
+def test_app_migrates_csv_to_sqlite_once(app_env, tmp_path):
+    (tmp_path / "data").mkdir()
+    make_history(3).save(tmp_path / "data" / "calculation_history.csv", "utf-8")
+    app_env.setenv("CALCULATOR_HISTORY_FORMAT", "sqlite")
+    app = CalculatorApp()
+    assert app.config.history_filepath.endswith(".db")
+    app.execute_calculation("add", 10, 5)
+    app.close()
+    (tmp_path / "data" / "calculation_history.csv").unlink()
+    reloaded = CalculatorApp()
+    assert reloaded.history.get_history().values("operand_a") == [0.0, 1.0, 2.0, 10.0]
+    reloaded.close()
+
+def test_atomic_write_keeps_old_file_when_write_fails(tmp_path):
+    path = tmp_path / "history.csv"
+    make_history(3).save(path, "utf-8")
+    before = path.read_bytes()
+    def fail(f):
+        f.write("partial")
+        raise RuntimeError("disk full")
+    with pytest.raises(RuntimeError): atomic_write(path, fail)
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["history.csv"]
+
+def test_csv_read_keeps_all_rows_below_limit(tmp_path):
+    path = tmp_path / "history.csv"
+    make_history(60, max_history=60).save(path, "utf-8")
+    loaded = HistoryManager(100)
+    loaded.load(path, "utf-8")
+    assert len(loaded) == 60
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 8, 64])
+def test_read_tail_lines_across_block_boundaries(monkeypatch, tmp_path, block_size):
+    import app.history_store as history_store
+    monkeypatch.setattr(history_store, "TAIL_BLOCK_SIZE", block_size)
+    header, lines = b"h1,h2\n", [f"{i},{i * 11}".encode() for i in range(12)]
+    path = tmp_path / "tail.csv"
+    path.write_bytes(header + b"\n".join(lines) + b"\n")
+    with open(path, "rb") as f:
+        for count in range(len(lines) + 3):
+            assert history_store.read_tail_lines(f, count, len(header)) == lines[max(len(lines) - count, 0):]
@@ -1,5 +1,7 @@
+from datetime import datetime
 import pytest
-from app.input_validators import validate_operands
+from app.input_validators import (validate_operands, validate_operands_bulk, operand_error_messages,
+                                  parse_operand_buffer, parse_history_query, parse_result_range)
 from app.exceptions import ValidationError
 
 def test_validate_operands_valid():
@@ -15,3 +17,37 @@ def test_validate_operands_valid():
 def test_validate_operands_invalid(inputs, expected_error):
     with pytest.raises(ValidationError, match=expected_error):
         validate_operands(inputs, 1000)
+
+def test_validate_operands_bulk_matches_scalar():
+    rows = [["5", "10.5"], ["5"], ["a", "1001"], ["1001", "5"], ["nan", "-3"], ["inf", "1"], [], ["1_0", "-0"]]
+    a, b, codes = validate_operands_bulk(rows, 1000)
+    messages = operand_error_messages(1000)
+    for i, inputs in enumerate(rows):
+        try:
+            expected = validate_operands(inputs, 1000)
+        except ValidationError as e:
+            assert messages[codes[i] - 1] == str(e)
+        else:
+            assert codes[i] == 0 and (a[i], b[i]) == pytest.approx(expected, nan_ok=True)
+
+def test_parse_operand_buffer():
+    ops, a, b, codes = parse_operand_buffer(b"add 1 2\n\nMULTIPLY 3 x\npower 2 3 4\n", 1e9)
+    assert ops == ["add", "multiply", "power"]
+    assert codes.tolist() == [0, 2, 1] and (a[0], b[0]) == (1.0, 2.0)
+
+def test_parse_history_query():
+    query = parse_history_query(["--op", "power", "--result", "'>100'", "--since", "2024-01-01t00:00:00", "--page", "2"])
+    assert query["op_name"] == "power" and query["result"] == (100.0, False, None, False)
+    assert query["since"] == datetime(2024, 1, 1).timestamp()
+    assert query["page"] == 2 and query["limit"] == 20
+    assert parse_result_range("1..5") == (1.0, True, 5.0, True)
+    assert parse_result_range("<=5") == (None, False, 5.0, True)
+
+@pytest.mark.parametrize("inputs", [["--op"], ["--bogus", "1"], ["--result", ">x"], ["--limit", "0"], ["--since", "soon"]])
+def test_parse_history_query_rejects_bad_input(inputs):
+    with pytest.raises(ValidationError):
+        parse_history_query(inputs)
+
+def test_parse_history_query_archive_flag():
+    assert parse_history_query(["--archive"]) == {"archive": True, "limit": 20}
+    assert parse_history_query(["--op", "add", "--archive", "--limit", "5"]) == {"op_name": "add", "limit": 5, "archive": True}
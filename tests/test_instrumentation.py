@@ -0,0 +1,42 @@
+import json
+from app.calculator import CalculatorApp, REPL
+from app.instrumentation import Histogram
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = Histogram()
+    for ns in range(1, 10001): histogram.record(ns * 1000)
+    assert histogram.count == 10000
+    assert 5_000_000 <= histogram.percentile(0.50) <= 5_000_000 * 1.125
+    assert 9_900_000 <= histogram.percentile(0.99) <= 10_000_000
+    assert histogram.percentile(1.0) == histogram.max == 10_000_000
+
+def test_disabled_app_is_not_wrapped(app_env):
+    app = CalculatorApp()
+    assert app.instrumentation is None
+    assert app.execute_calculation.__func__ is CalculatorApp.execute_calculation
+    assert "cache" not in app.stats()
+    app.close()
+
+def test_enabled_app_records_hot_paths(app_env, tmp_path, capsys):
+    app_env.setenv("CALCULATOR_INSTRUMENTATION", "true")
+    app_env.setenv("CALCULATOR_SAVE_MODE", "snapshot")
+    repl = REPL()
+    for _ in range(3): repl.execute_command("add", ["1", "2"])
+    repl.execute_command("divide", ["1", "0"])
+    repl.execute_command("stats", ["json", str(tmp_path / "stats.json")])
+    data = json.loads((tmp_path / "stats.json").read_text())
+    latency = data["latency"]
+    assert latency["execute_calculation"]["count"] == 4
+    assert latency["operation.add"]["count"] == 3 and latency["operation.divide"]["count"] == 1
+    assert latency["caretaker.save"]["count"] >= 3
+    assert latency["history.save"]["count"] == 3 and latency["history.load"]["count"] == 1
+    assert latency["observer.AutoSaveObserver"]["count"] == 3
+    assert data["bytes_written"]["history.save"] > 0
+    repl.execute_command("stats", ["reset"])
+    assert repl.app.stats()["latency"] == {}
+    capsys.readouterr()
+    repl.execute_command("stats", [])
+    assert "p99 us" in capsys.readouterr().out
+    repl.execute_command("stats", ["bogus"])
+    assert "Error: Usage: stats" in capsys.readouterr().out
+    repl.app.close()
@@ -0,0 +1,49 @@
+import json
+import logging
+import threading
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from app.logger import SamplingFilter, setup_logger, stop_logger, _listeners
+
+def read_log(tmp_path):
+    return (tmp_path / "calculator.log").read_text().splitlines()
+
+def test_logger_writes_through_queue(tmp_path):
+    logger = setup_logger(str(tmp_path))
+    logger.info("Calculation: %s = %s", "add", 3)
+    stop_logger(logger)
+    assert read_log(tmp_path)[0].endswith("INFO - Calculation: add = 3")
+
+def test_logger_json_format(tmp_path):
+    logger = setup_logger(str(tmp_path), log_format="json")
+    logger.warning("value %d", 7)
+    stop_logger(logger)
+    entry = json.loads(read_log(tmp_path)[0])
+    assert entry["level"] == "WARNING"
+    assert entry["message"] == "value 7"
+
+def test_logger_rotation_handlers(tmp_path):
+    logger = setup_logger(str(tmp_path), max_bytes=1024, backup_count=2)
+    handler = _listeners[logger.name].handlers[0]
+    assert isinstance(handler, RotatingFileHandler) and handler.maxBytes == 1024
+    logger = setup_logger(str(tmp_path), rotate_when="midnight")
+    assert isinstance(_listeners[logger.name].handlers[0], TimedRotatingFileHandler)
+    stop_logger(logger)
+
+def test_sampling_filter_keeps_fraction():
+    sampler = SamplingFilter(0.25)
+    sampled = [sampler.filter(logging.makeLogRecord({"sampled": True})) for _ in range(100)]
+    assert sum(sampled) == 25
+    assert sampler.filter(logging.makeLogRecord({}))
+
+def test_logger_defers_formatting(tmp_path):
+    class Expensive:
+        threads = set()
+        def __str__(self):
+            Expensive.threads.add(threading.current_thread())
+            return "expensive"
+    logger = setup_logger(str(tmp_path), sample_rate=0.5)
+    for _ in range(10): logger.info("%s", Expensive(), extra={"sampled": True})
+    logger.debug("%s", Expensive())
+    stop_logger(logger)
+    assert Expensive.threads and threading.current_thread() not in Expensive.threads
+    assert len(read_log(tmp_path)) == 5
@@ -38,3 +38,74 @@ def test_operation_errors(op_name, a, b, error_msg):
 def test_unknown_operation():
     with pytest.raises(OperationError, match="Unknown operation: 'log'"):
         OperationFactory.create("log")
+
+def test_operations_are_shared_instances():
+    assert OperationFactory.create("add") is OperationFactory.create("ADD") is OperationFactory.create("+")
+
+@pytest.mark.parametrize("alias, op_name", [("+", "add"), ("-", "subtract"), ("*", "multiply"), ("/", "divide"),
+                                            ("^", "power"), ("**", "power"), ("%", "modulus"), ("//", "int_divide"),
+                                            ("Add", "add")])
+def test_resolve_aliases(alias, op_name):
+    assert OperationFactory.resolve(alias) == op_name
+
+class Hypot(Operation):
+    aliases = ("hyp",)
+    def execute(self, a, b): return (a * a + b * b) ** 0.5
+
+class FakeEntryPoint:
+    def __init__(self, name, value): self.name, self.value = name, value
+    def load(self): return self.value
+
+@pytest.fixture
+def plugins(monkeypatch):
+    import importlib.metadata
+    found = []
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group: found if group == OperationFactory.ENTRY_POINT_GROUP else [])
+    monkeypatch.setattr(OperationFactory, "_plugins_loaded", False)
+    monkeypatch.setattr(OperationFactory, "_operations", dict(OperationFactory._operations))
+    monkeypatch.setattr(OperationFactory, "_aliases", dict(OperationFactory._aliases))
+    yield found
+    monkeypatch.undo()
+    OperationFactory._build()
+
+def test_plugins_load_on_first_miss(plugins):
+    plugins.append(FakeEntryPoint("hypot", Hypot))
+    assert OperationFactory.resolve("add") == "add"
+    assert not OperationFactory._plugins_loaded
+    assert OperationFactory.resolve("hyp") == "hypot"
+    assert OperationFactory.create("hypot").execute(3, 4) == 5
+    assert "hypot" in OperationFactory.get_operations()
+
+class BrokenEntryPoint(FakeEntryPoint):
+    def load(self): raise ImportError("missing dependency")
+
+def test_bad_plugins_are_logged_and_skipped(plugins, caplog):
+    plugins.extend([FakeEntryPoint("bad", object), BrokenEntryPoint("broken", None), FakeEntryPoint("history", Hypot),
+                    FakeEntryPoint("hypot", Hypot)])
+    assert OperationFactory.resolve("bad") is None
+    assert OperationFactory.resolve("hypot") == "hypot"
+    assert "history" not in OperationFactory.get_operations()
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("'bad'" in m and "not an Operation subclass" in m for m in messages)
+    assert any("'broken'" in m and "missing dependency" in m for m in messages)
+    assert any("'history'" in m and "built-in command" in m for m in messages)
+
+def test_reserved_names_do_not_scan_plugins(plugins):
+    assert OperationFactory.resolve("history") is None and not OperationFactory._plugins_loaded
+
+def test_reserved_names_cover_repl_commands(app_env):
+    from app.calculator import REPL
+    repl = REPL()
+    assert set(repl.commands) <= OperationFactory.RESERVED_NAMES
+    repl.app.close()
+
+def test_get_aliases_is_a_copy():
+    aliases = OperationFactory.get_aliases()
+    assert aliases["+"] == "add"
+    aliases["+"] = "subtract"
+    assert OperationFactory.resolve("+") == "add"
+
+def test_unknown_name_scans_plugins_once(plugins):
+    assert OperationFactory.resolve("log") is None
+    plugins.append(FakeEntryPoint("log", Hypot))
+    assert OperationFactory.resolve("log") is None
@@ -0,0 +1,34 @@
+import io
+import re
+import pytest
+from app.batch_mode import run_batch
+from app.calculator import REPL
+from app.parallel import evaluate_chunk, run_parallel_batch
+
+@pytest.fixture
+def make_repl(monkeypatch, tmp_path):
+    def make(name):
+        monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path / name / "logs"))
+        monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path / name / "data"))
+        monkeypatch.setenv("CALCULATOR_MAX_HISTORY_SIZE", "1000")
+        return REPL()
+    return make
+
+SCRIPT = ["add 2 3\n", "\n", "divide 1 0\n", "root -8 2\n", "power 2 x\n", "add 1\n", "multiply 4 2.5\n", "undo\n",
+          "history --op add\n", "foo\n", *(f"power {i} 2\n" for i in range(30)), "exit\n", "add 9 9\n"]
+
+def test_evaluate_chunk_matches_repl_messages():
+    assert evaluate_chunk(["add 1 2", "", "divide 1 0", "modulus 1", "history --op add"], 1e9, 4) == [
+        ("result", "add", 1.0, 2.0, 3.0), ("error", "Division by zero."),
+        ("error", "Exactly two numerical inputs are required."), ("command", "history", ["--op", "add"])]
+
+def test_parallel_batch_matches_sequential(make_repl):
+    sequential, parallel = make_repl("seq"), make_repl("par")
+    expected, actual = io.StringIO(), io.StringIO()
+    run_batch(sequential, SCRIPT, expected)
+    stats = run_parallel_batch(parallel, SCRIPT, actual, workers=2, chunk_size=4)
+    without_timestamps = lambda text: re.sub(r"^\S+: Calculation", "Calculation", text, flags=re.M)
+    assert without_timestamps(actual.getvalue()) == without_timestamps(expected.getvalue())
+    assert [repr(c) for c in parallel.app.history.get_history()] == [repr(c) for c in sequential.app.history.get_history()]
+    assert stats.lines > 0
+    sequential.app.close(); parallel.app.close()
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from app.calculator import CalculatorApp
+from app.server import CalculatorServer
+
+async def read_responses(reader, count: int) -> list[str]:
+    responses, lines = [], []
+    while len(responses) < count:
+        line = (await reader.readline()).decode()
+        if line == ".\n":
+            responses.append("".join(lines)); lines = []
+        else:
+            lines.append(line)
+    return responses
+
+def test_sessions_pipeline_with_independent_undo(app):
+    async def scenario():
+        calculator_server = CalculatorServer(app)
+        server = await calculator_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        (r1, w1), (r2, w2) = [await asyncio.open_connection("127.0.0.1", port) for _ in range(2)]
+        w1.write(b"add 1 2\nmultiply 2 3\n\ndivide 1 0\nundo\n")
+        w2.write(b"power 2 10\nundo\nundo\n")
+        first, second = await read_responses(r1, 4), await read_responses(r2, 3)
+        w1.write(b"history\nexit\nadd 5 5\n")
+        history = (await read_responses(r1, 1))[0]
+        assert await r1.read() == b""
+        w2.close()
+        server.close()
+        await server.wait_closed()
+        calculator_server.close()
+        return first, second, history
+    first, second, history = asyncio.run(scenario())
+    assert first == ["Result: 3.0\n", "Result: 6.0\n", "Error: Division by zero.\n", "Undo successful.\n"]
+    assert second == ["Result: 1024.0\n", "Undo successful.\n", "Error: Cannot undo: No previous state.\n"]
+    assert "Calculation(1.0, 2.0, 'add', 3.0)" in history and "multiply" not in history and "power" not in history
+    assert sorted(calc.result for calc in app.history.get_history()) == [3.0, 6.0, 1024.0]
+
+def test_commands_run_off_the_event_loop(app):
+    # A slow command (here: save) must not stop the loop from serving other connections.
+    released, unblocked = threading.Event(), []
+    calculator_server = CalculatorServer(app)
+    respond = calculator_server.respond
+    def slow_respond(repl, line):
+        if line.startswith(b"save"): unblocked.append(released.wait(5))
+        return respond(repl, line)
+    calculator_server.respond = slow_respond
+    async def scenario():
+        server = await calculator_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+        w1.write(b"save\nadd 1 2\n")
+        await asyncio.sleep(0.05)
+        released.set()
+        responses = await read_responses(r1, 2)
+        w1.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    responses = asyncio.run(scenario())
+    calculator_server.close()
+    assert unblocked == [True]
+    assert responses[1] == "Result: 3.0\n"
+
+def test_session_stats_report_shared_app(app_env):
+    from app.batch_mode import run_command
+    from app.calculator import REPL
+    from app.server import SessionApp
+    app_env.setenv("CALCULATOR_INSTRUMENTATION", "true")
+    shared = CalculatorApp()
+    session = SessionApp(shared)
+    assert session.lock is not shared.lock and session.history is not shared.history
+    repl = REPL(session)
+    run_command(repl, "add", ["1", "2"])
+    report = run_command(repl, "stats", [])
+    assert "Instrumentation is disabled" not in report and "history.record" in report and "1 appends" in report
+    assert len(shared.history) == len(session.history) == 1
+    shared.close()
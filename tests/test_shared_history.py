@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+from app.calculation import Calculation
+from app.calculator_memento import Caretaker
+from app.history import HistoryManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def session(path):
+    history = HistoryManager(100, multi_writer=True)
+    history.load(path, "utf-8")
+    caretaker = Caretaker(history)
+    caretaker.save()
+    return history, caretaker
+
+def calculate(history, caretaker, path, a, created):
+    calc = Calculation(a, 1, "add", a + 1, created=created)
+    with history.shared_lock(path, "utf-8"):
+        history.add(calc)
+        caretaker.save()
+        history.record("calculation", path, "utf-8", calc)
+
+def results(history):
+    return [c.result for c in history.get_history()]
+
+def test_sessions_merge_appends_by_timestamp(tmp_path):
+    path = tmp_path / "history.csv"
+    (a, a_undo), (b, b_undo) = session(path), session(path)
+    calculate(a, a_undo, path, 1, 100.0)
+    calculate(b, b_undo, path, 3, 300.0)
+    calculate(a, a_undo, path, 2, 200.0)
+    b.refresh(path, "utf-8")
+    assert results(a) == results(b) == [2, 3, 4]
+    assert a.save_stats.appends == 2
+
+def test_undo_rewrites_without_dropping_other_sessions(tmp_path):
+    path = tmp_path / "history.csv"
+    (a, a_undo), (b, b_undo) = session(path), session(path)
+    calculate(a, a_undo, path, 1, 100.0)
+    calculate(b, b_undo, path, 3, 300.0)
+    with a.shared_lock(path, "utf-8"):
+        a_undo.undo()
+        a.record("undo", path, "utf-8")
+    assert results(a) == [4]
+    b.refresh(path, "utf-8")
+    assert results(b) == [4]
+    with a.shared_lock(path, "utf-8"):
+        a_undo.redo()
+        a.record("redo", path, "utf-8")
+    assert results(a) == [2, 4]
+
+def test_undone_clear_keeps_rows_added_elsewhere(tmp_path):
+    path = tmp_path / "history.csv"
+    (a, a_undo), (b, b_undo) = session(path), session(path)
+    calculate(a, a_undo, path, 1, 100.0)
+    with a.shared_lock(path, "utf-8"):
+        a.clear(); a_undo.save(); a.record("clear", path, "utf-8")
+    calculate(b, b_undo, path, 3, 300.0)
+    with a.shared_lock(path, "utf-8"):
+        a_undo.undo(); a.record("undo", path, "utf-8")
+    assert results(a) == [2, 4]
+    b.refresh(path, "utf-8")
+    assert results(b) == [2, 4]
+
+WRITER = """
+from app.calculator import CalculatorApp
+app = CalculatorApp()
+for i in range({n}):
+    app.execute_calculation("add", {writer}, i)
+    if i % 10 == 9: app.show_history()
+app.close()
+"""
+
+def test_concurrent_writer_processes(tmp_path):
+    writers, per_writer = 4, 100
+    env = {**os.environ, "CALCULATOR_LOG_DIR": str(tmp_path / "logs"), "CALCULATOR_HISTORY_DIR": str(tmp_path / "data"),
+           "CALCULATOR_MULTI_WRITER": "true", "CALCULATOR_MAX_HISTORY_SIZE": "1000",
+           "CALCULATOR_JOURNAL_COMPACT_EVERY": "15", "CALCULATOR_FSYNC_POLICY": "never"}
+    procs = [subprocess.Popen([sys.executable, "-c", WRITER.format(n=per_writer, writer=w)], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL) for w in range(writers)]
+    assert all(proc.wait(timeout=60) == 0 for proc in procs)
+    history = HistoryManager(1000, multi_writer=True)
+    history.load(tmp_path / "data" / "calculation_history.csv", "utf-8")
+    calcs = list(history.get_history())
+    assert sorted((c.operand_a, c.operand_b) for c in calcs) == \
+        sorted((w, i) for w in range(writers) for i in range(per_writer))
+    stamps = [c.created for c in calcs]
+    assert stamps == sorted(stamps)
+
+def test_reload_sorts_rows_appended_out_of_order(tmp_path):
+    path = tmp_path / "history.csv"
+    (a, a_undo), (b, b_undo) = session(path), session(path)
+    calculate(a, a_undo, path, 1, 100.0)
+    calculate(a, a_undo, path, 3, 300.0)
+    calculate(a, a_undo, path, 2, 200.0)
+    fresh, _ = session(path)
+    assert results(fresh) == [2, 3, 4]
+    a.save(path, "utf-8")
+    with b.shared_lock(path, "utf-8"): pass
+    assert results(b) == results(fresh) == results(a)
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous enough for slow CI runners; a pandas/numpy import on the startup path blows well past it.
+IMPORT_BUDGET_SECONDS = float(os.getenv("CALCULATOR_IMPORT_BUDGET", "0.3"))
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+def test_startup_skips_heavy_imports():
+    loaded = run_python("import sys, app.__main__; print([m for m in ('pandas', 'numpy') if m in sys.modules])")
+    assert loaded.strip() == "[]"
+
+def test_startup_import_budget():
+    elapsed = min(float(run_python(
+        "import time; start = time.perf_counter(); import app.__main__; print(time.perf_counter() - start)"
+    )) for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS
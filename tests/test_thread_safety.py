@@ -0,0 +1,74 @@
+import sys
+import threading
+import pytest
+from unittest.mock import patch
+from app.calculator import CalculatorApp
+from app.history import HistoryManager
+from app.operations import Addition
+
+@pytest.fixture
+def app_env(app_env):
+    app_env.setenv("CALCULATOR_THREAD_SAFE", "true")
+    app_env.setenv("CALCULATOR_MAX_HISTORY_SIZE", "100000")
+    app_env.setenv("CALCULATOR_MAX_UNDO_DEPTH", "100000")
+    app_env.setenv("CALCULATOR_LOG_SAMPLE_RATE", "0")
+    return app_env
+
+@pytest.mark.parametrize("observer_mode", ["sync", "async"])
+def test_concurrent_commands_are_linearizable(app_env, observer_mode):
+    app_env.setenv("CALCULATOR_OBSERVER_MODE", observer_mode)
+    app = CalculatorApp()
+    threads, per_thread, undone = 8, 100, []
+    def worker(tid: int):
+        count = 0
+        for i in range(per_thread):
+            app.execute_calculation("add", tid, i)
+            if tid % 2 and i % 10 == 9:
+                try:
+                    app.undo(); count += 1
+                except IndexError:
+                    pass
+        undone.append(count)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        with patch("builtins.print"):
+            pool = [threading.Thread(target=worker, args=(tid,)) for tid in range(threads)]
+            for thread in pool: thread.start()
+            for thread in pool: thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    rows = [(calc.operand_a, calc.operand_b) for calc in app.history.get_history()]
+    assert len(rows) == threads * per_thread - sum(undone)
+    # Undo is global, so it may remove another thread's latest calculation, but never reorders the survivors.
+    for tid in range(threads):
+        sequence = [b for a, b in rows if a == tid]
+        assert sequence == sorted(sequence)
+
+    # The journal was written in the same order the history changed, so a reload reproduces it exactly.
+    app.flush_observers()
+    reloaded = HistoryManager(100000)
+    reloaded.load(app.config.history_filepath, app.config.encoding)
+    assert [(calc.operand_a, calc.operand_b) for calc in reloaded.get_history()] == rows
+    with patch("builtins.print"):
+        for _ in range(len(rows)): app.undo()
+    assert len(app.history) == 0
+    app.close()
+
+def test_compute_runs_outside_the_lock(app_env):
+    app = CalculatorApp()
+    entered, release = threading.Event(), threading.Event()
+    def slow_add(self, a, b):
+        entered.set()
+        release.wait(5)
+        return a + b
+    with patch.object(Addition, "execute", slow_add):
+        slow = threading.Thread(target=app.execute_calculation, args=("add", 1, 2))
+        slow.start()
+        assert entered.wait(5)
+        assert app.execute_calculation("multiply", 3, 4) == 12
+        release.set()
+        slow.join()
+    assert [calc.result for calc in app.history.get_history()] == [12, 3]
+    app.close()